@@ -1,13 +1,15 @@
 """Suppoort for Ariston."""
+import asyncio
+from collections import deque
 from datetime import timedelta
 import logging
-import requests
+import aiohttp
 import threading
 import voluptuous as vol
 import json
-import copy
 import dateutil.parser
 import time
+from yarl import URL
 
 from homeassistant.components.binary_sensor import DOMAIN as BINARY_SENSOR
 from homeassistant.components.climate import DOMAIN as CLIMATE
@@ -17,68 +19,131 @@ from homeassistant.components.water_heater import DOMAIN as WATER_HEATER
 from homeassistant.const import (
     ATTR_ENTITY_ID,
     CONF_BINARY_SENSORS,
+    CONF_ENTITY_ID,
     CONF_NAME,
     CONF_PASSWORD,
     CONF_SENSORS,
+    CONF_STATE,
     CONF_SWITCHES,
     CONF_USERNAME,
+    EVENT_HOMEASSISTANT_START,
+    EVENT_HOMEASSISTANT_STOP,
+    STATE_ON,
 )
+from homeassistant.core import CoreState, callback
 from homeassistant.exceptions import Unauthorized, UnknownUser
 import homeassistant.helpers.config_validation as cv
 from homeassistant.helpers import discovery
-from homeassistant.helpers.dispatcher import dispatcher_send
-from homeassistant.helpers.event import track_point_in_time
-from homeassistant.util import dt as dt_util
+from homeassistant.helpers.event import async_call_later, async_track_point_in_time, async_track_state_change
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util, slugify
 
+from .auth import AristonAuth
 from .binary_sensor import BINARY_SENSORS
+from .breaker import STATE_CLOSED, CircuitBreaker
 from .const import (
-    CH_MODE_TO_VALUE,
     CLIMATES,
+    CONF_BREAKER_RESET,
+    CONF_BREAKER_THRESHOLD,
     CONF_HVAC_OFF,
+    CONF_END,
+    CONF_HOURLY_BUDGET,
+    CONF_INTERVAL,
     CONF_POWER_ON,
     CONF_MAX_RETRIES,
+    CONF_KEEPALIVE,
+    CONF_POLL_INTERVAL_MAX,
+    CONF_POLL_INTERVAL_MIN,
+    CONF_POLLING_PROFILES,
+    CONF_POOL_SIZE,
+    CONF_SET_DEBOUNCE,
+    CONF_START,
     DATA_ARISTON,
     DEVICES,
     DOMAIN,
-    MODE_TO_VALUE,
+    SERVICE_BURST_POLL,
+    SERVICE_PAUSE_POLLING,
+    SERVICE_RESUME_POLLING,
     SERVICE_SET_DATA,
-    SERVICE_UPDATE,
-    PARAM_MODE,
-    PARAM_CH_MODE,
-    PARAM_CH_SET_TEMPERATURE,
-    PARAM_DHW_SET_TEMPERATURE,
+    SERVICE_SET_POLLING_PROFILE,
+    PARAM_DURATION,
+    PARAM_INTERVAL,
+    PARAM_PROFILE,
     VAL_MODE_WINTER,
     VAL_MODE_SUMMER,
     VAL_MODE_OFF,
     VAL_CH_MODE_MANUAL,
     VAL_CH_MODE_SCHEDULED,
+    VAL_PROFILE_ACTIVE,
+    VAL_PROFILE_AUTO,
     WATER_HEATERS,
+    WRITABLE_FIELDS,
 )
 from .exceptions import CommError, LoginError, AristonError
-from .helpers import service_signal
+from .helpers import Backoff, FrozenDict, TimedLock, changed_paths, data_size, flatten_data, freeze_data, overlay_value
+from .scheduler import AristonScheduler, PRIORITY_CONFIRM, PRIORITY_PERIODIC
 from .sensor import SENSORS
 from .switch import SWITCHES
 
-"""HTTP_RETRY_INTERVAL is time between 2 GET requests. Note that it often takes more than 10 seconds to properly fetch data, also potential login"""
+"""HTTP_RETRY_INTERVAL is default shortest time between 2 GET requests. Note that it often takes more than 10 seconds to properly fetch data, also potential login"""
+"""POLL_BACKOFF is factor by which time between 2 GET requests grows while data does not change, up to configured ceiling"""
+"""ACTIVITY_PATHS are data paths whose change means boiler is active and data is fetched as often as allowed"""
 """MAX_ERRORS is number of errors for device to become not available"""
+"""BACKOFF_* are base and cap of exponential backoff with full jitter after failed login or failed data fetch, BACKOFF_MIN is shortest retry delay"""
 """HTTP_TIMEOUT_LOGIN is timeout for login procedure"""
 """HTTP_TIMEOUT_GET is timeout to get data (can increase restart time in some cases). For tested environment often around 10 seconds, rarely above 15"""
 """HTTP_TIMEOUT_SET is timeout to set data"""
+"""TIMER_SET_LOCK is time after setting data during which periodic reading is postponed to give boiler time to apply changes"""
+"""SETUP_CONCURRENCY is number of accounts logging in and fetching first data at the same time during startup"""
+"""STORE_SAVE_DELAY is minimum time between 2 writes of last fetched data and session to storage"""
+"""SET_DEADLINE is time after change was requested when it is given up even if retries are left, also while offline"""
+"""JOURNAL_SAVE_DELAY is time to collect changes of pending values before they are written to storage"""
+"""SET_FRESH_DATA_AGE is age of data after which it is read again before setting, so that changes made by other clients are not overwritten"""
+"""CONFIRM_INTERVALS are delays between reads after setting data until server shows all changes"""
 
 ARISTON_URL = "https://www.ariston-net.remotethermo.com"
+CONFIRM_INTERVALS = [10, 20, 40]
 DEFAULT_HVAC = "summer"
 DEFAULT_POWER_ON = "summer"
 DEFAULT_NAME = "Ariston"
 DEFAULT_MAX_RETRIES = 1
+DEFAULT_POOL_SIZE = 2
+DEFAULT_KEEPALIVE = 15
+DEFAULT_SET_DEBOUNCE = 2
+DEFAULT_POLL_INTERVAL_MAX = 600
+DEFAULT_HOURLY_BUDGET = 200
+DEFAULT_BURST_INTERVAL = 10
+DEFAULT_BURST_DURATION = 300
+DEFAULT_PAUSE_DURATION = 3600
+DEFAULT_BREAKER_THRESHOLD = 3
+DEFAULT_BREAKER_RESET = 120
 DEFAULT_TIME = "00:00"
+ENDPOINT_LOGIN = "login"
+ENDPOINT_GET = "GetPlantData"
+ENDPOINT_SET = "SetPlantAndZoneData"
 HTTP_RETRY_INTERVAL = 45
 HTTP_RETRY_INTERVAL_DOWN = 80
 HTTP_SET_INTERVAL = HTTP_RETRY_INTERVAL_DOWN * 2
 HTTP_TIMEOUT_LOGIN = 3
 HTTP_TIMEOUT_GET = 15
 HTTP_TIMEOUT_SET = 15
+JOURNAL_SAVE_DELAY = 1
 MAX_ERRORS = 4
-MAX_ERRORS_TIMER_EXTEND = 2
+BACKOFF_LOGIN_BASE = 120
+BACKOFF_LOGIN_CAP = 6 * 3600
+BACKOFF_DATA_BASE = HTTP_RETRY_INTERVAL_DOWN
+BACKOFF_DATA_CAP = 3600
+BACKOFF_MIN = 10
+POLL_BACKOFF = 1.5
+ACTIVITY_PATHS = {"flameSensor", "zone.roomTemp"} | {field["path"] for field in WRITABLE_FIELDS.values()}
+SETUP_CONCURRENCY = 3
+SET_DEADLINE = 3600
+SET_FRESH_DATA_AGE = 30
+STORAGE_VERSION = 1
+STORAGE_KEY_DATA = DOMAIN + ".{}.data"
+STORAGE_KEY_SESSION = DOMAIN + ".{}.session"
+STORAGE_KEY_JOURNAL = DOMAIN + ".{}.journal"
+STORE_SAVE_DELAY = 300
 TIMER_SET_LOCK = 25
 
 _LOGGER = logging.getLogger(__name__)
@@ -89,6 +154,17 @@ def _has_unique_names(devices):
     return devices
 
 
+POLLING_PROFILE_SCHEMA = vol.Schema(
+    {
+        vol.Required(CONF_NAME): cv.string,
+        vol.Required(CONF_INTERVAL): vol.All(int, vol.Range(min=15, max=86400)),
+        vol.Inclusive(CONF_START, "window"): cv.time,
+        vol.Inclusive(CONF_END, "window"): cv.time,
+        vol.Optional(CONF_ENTITY_ID): cv.entity_id,
+        vol.Optional(CONF_STATE, default=STATE_ON): cv.string,
+    }
+)
+
 ARISTON_SCHEMA = vol.Schema(
     {
         vol.Required(CONF_USERNAME): cv.string,
@@ -99,10 +175,43 @@ ARISTON_SCHEMA = vol.Schema(
         vol.Optional(CONF_HVAC_OFF, default=DEFAULT_HVAC): vol.In(["OFF", "off", "Off", "summer", "SUMMER", "Summer"]),
         vol.Optional(CONF_POWER_ON, default=DEFAULT_POWER_ON): vol.In(["WINTER", "winter", "Winter", "summer", "SUMMER", "Summer"]),
         vol.Optional(CONF_MAX_RETRIES, default=DEFAULT_MAX_RETRIES): vol.All(int, vol.Range(min=0, max=65535)),
+        vol.Optional(CONF_POOL_SIZE, default=DEFAULT_POOL_SIZE): vol.All(int, vol.Range(min=1, max=16)),
+        vol.Optional(CONF_KEEPALIVE, default=DEFAULT_KEEPALIVE): vol.All(int, vol.Range(min=0, max=3600)),
+        vol.Optional(CONF_SET_DEBOUNCE, default=DEFAULT_SET_DEBOUNCE): vol.All(vol.Coerce(float), vol.Range(min=0, max=60)),
+        vol.Optional(CONF_POLL_INTERVAL_MIN, default=HTTP_RETRY_INTERVAL): vol.All(int, vol.Range(min=15, max=3600)),
+        vol.Optional(CONF_POLL_INTERVAL_MAX, default=DEFAULT_POLL_INTERVAL_MAX): vol.All(int, vol.Range(min=15, max=3600)),
+        vol.Optional(CONF_POLLING_PROFILES, default=[]): vol.All(cv.ensure_list, [POLLING_PROFILE_SCHEMA]),
+        vol.Optional(CONF_HOURLY_BUDGET, default=DEFAULT_HOURLY_BUDGET): vol.All(int, vol.Range(min=10, max=3600)),
+        vol.Optional(CONF_BREAKER_THRESHOLD, default=DEFAULT_BREAKER_THRESHOLD): vol.All(int, vol.Range(min=1, max=100)),
+        vol.Optional(CONF_BREAKER_RESET, default=DEFAULT_BREAKER_RESET): vol.All(int, vol.Range(min=10, max=3600)),
         vol.Optional(CONF_SWITCHES): vol.All(cv.ensure_list, [vol.In(SWITCHES)]),
     }
 )
 
+SET_POLLING_PROFILE_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_ENTITY_ID): cv.entity_id,
+        vol.Optional(PARAM_PROFILE, default=VAL_PROFILE_AUTO): cv.string,
+    }
+)
+
+BURST_POLL_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_ENTITY_ID): cv.entity_id,
+        vol.Optional(PARAM_INTERVAL, default=DEFAULT_BURST_INTERVAL): vol.All(vol.Coerce(int), vol.Range(min=5, max=300)),
+        vol.Optional(PARAM_DURATION, default=DEFAULT_BURST_DURATION): vol.All(vol.Coerce(int), vol.Range(min=10, max=3600)),
+    }
+)
+
+PAUSE_POLLING_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_ENTITY_ID): cv.entity_id,
+        vol.Optional(PARAM_DURATION, default=DEFAULT_PAUSE_DURATION): vol.All(vol.Coerce(int), vol.Range(min=10, max=86400)),
+    }
+)
+
+RESUME_POLLING_SCHEMA = vol.Schema({vol.Required(ATTR_ENTITY_ID): cv.entity_id})
+
 CONFIG_SCHEMA = vol.Schema(
     {DOMAIN: vol.All(cv.ensure_list, [ARISTON_SCHEMA], _has_unique_names)},
     extra=vol.ALLOW_EXTRA,
@@ -110,34 +219,76 @@ CONFIG_SCHEMA = vol.Schema(
 
 class AristonChecker():
     """Ariston checker"""
-    
+
     def __init__(self, hass, device, name, username, password, retries):
         """Initialize."""
         self._ariston_data = {}
-        self._data_lock = threading.Lock()
+        self._ariston_paths = {}
+        self._api_calls = deque()
+        self._auth = AristonAuth(username, password)
+        self._backoff_until = 0
+        self._burst_interval = 0
+        self._burst_until = 0
+        self._confirm_step = 0
+        self._confirm_time_last = None
+        self._confirm_unsub = None
+        self._data_lock = TimedLock()
+        self._data_store = Store(hass, STORAGE_VERSION, STORAGE_KEY_DATA.format(slugify(name)))
+        self._data_time = 0
         self._device = device
         self._errors = 0
+        self._fetch_calls_saved = 0
         self._get_time_start = 0
         self._get_time_end = 0
         self._hass = hass
         self._init_available = False
+        self._listeners = {}
+        self._listeners_all = []
+        self._journal_store = Store(hass, STORAGE_VERSION, STORAGE_KEY_JOURNAL.format(slugify(name)))
         self._lock = threading.Lock()
         self._login = False
         self._name = name
         self._password = password
+        self._pause_until = 0
+        self._pending_paths = set()
         self._plant_id = ""
         self._plant_id_lock = threading.Lock()
+        self._command_unsub = None
+        self._next_fetch = None
+        self._poll_interval = device[CONF_POLL_INTERVAL_MIN]
+        self._profile_forced = None
+        self._profile_name = VAL_PROFILE_ACTIVE
+        self._profiles = {profile[CONF_NAME]: profile for profile in device[CONF_POLLING_PROFILES]}
+        self._refresh_task = None
+        self._saves_pending = set()
         self._retry_timeout = HTTP_RETRY_INTERVAL
-        self._session = requests.Session()
+        self._scheduler = AristonScheduler(hass, name, TIMER_SET_LOCK, lambda: self._set_debounce_unsub is not None)
+        self._breakers = {
+            endpoint: CircuitBreaker(device[CONF_BREAKER_THRESHOLD], device[CONF_BREAKER_RESET])
+            for endpoint in (ENDPOINT_LOGIN, ENDPOINT_GET, ENDPOINT_SET)
+        }
+        self._cookie_jar = None
+        self._data_backoff = Backoff(BACKOFF_DATA_BASE, BACKOFF_DATA_CAP)
+        self._login_backoff = Backoff(BACKOFF_LOGIN_BASE, BACKOFF_LOGIN_CAP)
+        self._read_session = None
+        self._write_session = None
+        self._session_restored = False
+        self._server_data = {}
+        self._snapshot_size = None
+        self._snapshot_time = 0
+        self._server_paths = {}
+        self._session_store = Store(hass, STORAGE_VERSION, STORAGE_KEY_SESSION.format(slugify(name)), private=True)
+        self._set_coalesced = 0
+        self._set_conflicts_avoided = 0
+        self._set_debounce_unsub = None
         self._set_param = {}
-        self._set_retry = 0
         self._set_max_retries = retries
-        self._set_new_data = False
-        self._set_scheduled = False
+        self._set_retries = {}
+        self._set_retry_unsub = None
         self._set_time_start = 0
         self._set_time_end = 0
-        self._token_lock = threading.Lock()
-        self._token = None
+        self._state_writes = 0
+        self._state_writes_last = 0
         self._url = ARISTON_URL
         self._user = username
         self._verify = True
@@ -145,92 +296,426 @@ class AristonChecker():
     @property
     def available(self):
         """Return if Aristons's API is responding."""
-        return self._errors <= MAX_ERRORS and self._init_available
+        return self._errors <= MAX_ERRORS and (self._init_available or self._ariston_data != {})
+
+    @property
+    def data_age(self):
+        """Return age in seconds of data restored from storage, None when data is live"""
+        if self._init_available or not self._data_time:
+            return None
+        return round(time.time() - self._data_time)
+
+    @property
+    def snapshot_size(self):
+        """Return approximate bytes retained by server data, measured once per snapshot when asked for"""
+        if self._snapshot_size is None:
+            self._snapshot_size = data_size(self._server_data)
+        return self._snapshot_size
+
+    def entity_attributes(self, paths=None):
+        """Return state attributes common to all entities, pending values only for entity data paths"""
+        attrs = {}
+        if self.data_age is not None:
+            attrs["Data age"] = self.data_age
+        pending = {
+            param: value
+            for param, value in self._set_param.items()
+            if paths is None or any(
+                WRITABLE_FIELDS[param]["path"] == path or WRITABLE_FIELDS[param]["path"].startswith(path + ".")
+                for path in paths)
+        }
+        if pending:
+            attrs["Pending"] = pending
+        return attrs
+
+    def add_listener(self, update_callback, paths=None):
+        """Subscribe callback to changes of data paths (all data if None) and availability changes"""
+        if paths is None:
+            self._listeners_all.append(update_callback)
+        else:
+            for path in paths:
+                self._listeners.setdefault(path, []).append(update_callback)
+
+        def remove_listener():
+            """Unsubscribe callback"""
+            if paths is None:
+                self._listeners_all.remove(update_callback)
+            else:
+                for path in paths:
+                    self._listeners[path].remove(update_callback)
+
+        return remove_listener
+
+    def _notify_listeners(self, changed=None):
+        """Notify entities subscribed to changed paths once, all entities if changed is None"""
+        if changed is None:
+            callbacks = list(self._listeners_all)
+            for path_callbacks in self._listeners.values():
+                callbacks.extend(path_callbacks)
+        elif changed:
+            callbacks = list(self._listeners_all)
+            for path in changed:
+                #data path matches subscriptions to itself and to any of its parents
+                prefix = ""
+                for part in path.split("."):
+                    prefix = prefix + "." + part if prefix else part
+                    callbacks.extend(self._listeners.get(prefix, []))
+        else:
+            callbacks = []
+        callbacks = list(dict.fromkeys(callbacks))
+        self._state_writes_last = len(callbacks)
+        self._state_writes += self._state_writes_last
+        for update_callback in callbacks:
+            update_callback()
+
+    def _notify_diagnostics(self):
+        """Notify entities subscribed to all data, which show diagnostics, that polling or circuit state changed"""
+        for update_callback in list(self._listeners_all):
+            update_callback()
+
+    def _parse_data(self, resp_text):
+        """Parse reply into read-only snapshot"""
+        start = time.monotonic()
+        data = json.loads(resp_text, object_hook=FrozenDict)
+        self._snapshot_time = time.monotonic() - start
+        return data
+
+    def _store_data(self, data):
+        """Publish new read-only snapshot from server and return paths changed for entities"""
+        start = time.monotonic()
+        self._server_data = data
+        self._server_paths = flatten_data(data)
+        self._snapshot_time += time.monotonic() - start
+        #size walk is left out of timing and made only when diagnostics ask for it
+        self._snapshot_size = None
+        self._data_time = time.time()
+        self._schedule_save(self._data_store, self._data_to_store)
+        return self._update_view()
+
+    def _update_view(self):
+        """Overlay values being set on server data for entities and return paths changed for them"""
+        data = self._server_data
+        paths = self._server_paths
+        pending_paths = set()
+        if data:
+            paths = dict(paths)
+            for param, value in self._set_param.items():
+                data = overlay_value(data, WRITABLE_FIELDS[param]["path"], value)
+                paths[WRITABLE_FIELDS[param]["path"]] = value
+                pending_paths.add(WRITABLE_FIELDS[param]["path"])
+        changed = changed_paths(self._ariston_paths, paths)
+        #pending attribute changes even if value does not
+        changed.update(pending_paths ^ self._pending_paths)
+        self._ariston_data = data
+        self._ariston_paths = paths
+        self._pending_paths = pending_paths
+        return changed
+
+    def _log_rollback(self, unconfirmed):
+        """Warn about values which server did not take, entities show server values again"""
+        rolled_back = {
+            param: value
+            for param, value in unconfirmed.items()
+            if param not in self._set_param and self._server_paths.get(WRITABLE_FIELDS[param]["path"]) != value
+        }
+        if rolled_back:
+            _LOGGER.warning('%s Changes %s were not confirmed by server, rolled back', self, rolled_back)
+
+    def _confirm_set_param(self):
+        """Drop values being set which fetched server data already shows and return paths changed for entities"""
+        was_pending = bool(self._set_param)
+        for param, value in list(self._set_param.items()):
+            if self._server_paths.get(WRITABLE_FIELDS[param]["path"]) == value:
+                _LOGGER.debug('%s Change of %s confirmed', self, param)
+                self._drop_set_param(param)
+        if was_pending and not self._set_param and self._set_time_start:
+            self._confirm_time_last = round(time.time() - self._set_time_start, 1)
+            _LOGGER.info('%s Changes confirmed in %s seconds', self, self._confirm_time_last)
+        return self._update_view()
+
+    def _schedule_save(self, store, data_func):
+        """Write store once delay passes after first change, later changes are written with it and do not postpone it"""
+        if store in self._saves_pending:
+            return
+        self._saves_pending.add(store)
+
+        def data_to_save():
+            """Return latest data when delayed save is written"""
+            self._saves_pending.discard(store)
+            return data_func()
+
+        store.async_delay_save(data_to_save, STORE_SAVE_DELAY)
+
+    def _data_to_store(self):
+        """Return last fetched data to be written to storage"""
+        return {"time": self._data_time, "data": self._server_data}
+
+    def _journal_to_store(self):
+        """Return pending values in order of request to be written to storage"""
+        return {
+            "entries": [
+                {
+                    "param": param,
+                    "value": value,
+                    "time": self._set_retries[param]["requested"],
+                    "ttl": SET_DEADLINE,
+                }
+                for param, value in self._set_param.items()
+            ]
+        }
+
+    def _session_to_store(self):
+        """Return session cookies and plant ID to be written to private storage"""
+        return {
+            "username": self._user,
+            "plant_id": self._plant_id,
+            "cookies": {cookie.key: cookie.value for cookie in self._cookie_jar},
+        }
+
+    def _create_session(self):
+        """Create HTTP session with own connection pool and cookie jar shared with other session"""
+        if self._device[CONF_KEEPALIVE]:
+            keepalive = {"keepalive_timeout": self._device[CONF_KEEPALIVE]}
+        else:
+            keepalive = {"force_close": True}
+        connector = aiohttp.TCPConnector(
+            limit=self._device[CONF_POOL_SIZE],
+            ssl=None if self._verify else False,
+            **keepalive)
+        return aiohttp.ClientSession(connector=connector, cookie_jar=self._cookie_jar)
+
+    async def async_setup(self):
+        """Create HTTP sessions for reading and writing on the event loop and restore last stored data"""
+        if self._read_session is None:
+            #separate pools so that writing is never queued behind slow reading, cookies are common
+            self._cookie_jar = aiohttp.CookieJar()
+            self._read_session = self._create_session()
+            self._write_session = self._create_session()
+
+            async def async_close_sessions(event):
+                """Close HTTP sessions on stop"""
+                await self._read_session.close()
+                await self._write_session.close()
+
+            self._hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, async_close_sessions)
+            profile_entities = [
+                profile[CONF_ENTITY_ID] for profile in self._profiles.values() if CONF_ENTITY_ID in profile]
+            if profile_entities:
+                async_track_state_change(self._hass, profile_entities, self._profile_changed)
+            stored = await self._data_store.async_load()
+            if stored and not self._ariston_data:
+                self._server_data = freeze_data(stored["data"])
+                self._server_paths = flatten_data(self._server_data)
+                self._data_time = stored["time"]
+                self._update_view()
+                _LOGGER.info('%s Restored data fetched %s seconds ago', self, self.data_age)
+            stored = await self._journal_store.async_load()
+            if stored:
+                #replay changes not yet confirmed before restart, expired ones are compacted away
+                for entry in sorted(stored["entries"], key=lambda entry: entry["time"]):
+                    if entry["param"] in WRITABLE_FIELDS and entry["time"] + entry["ttl"] > time.time():
+                        self._request_set_param(entry["param"], entry["value"], entry["time"])
+                    else:
+                        self._journal_store.async_delay_save(self._journal_to_store, JOURNAL_SAVE_DELAY)
+                if self._set_param:
+                    self._update_view()
+                    _LOGGER.info('%s Restored pending changes %s', self, self._set_param)
+            stored = await self._session_store.async_load()
+            if stored and stored["username"] == self._user and stored["plant_id"] != "":
+                #try stored session before logging in again
+                self._cookie_jar.update_cookies(stored["cookies"], URL(self._url))
+                with self._plant_id_lock:
+                    self._plant_id = stored["plant_id"]
+                    self._login = True
+                self._session_restored = True
+                _LOGGER.info('%s Restored session for plant ID %s', self, self._plant_id)
+
+    def _run_coroutine(self, coro):
+        """Run coroutine on the event loop from worker thread and wait for result"""
+        return asyncio.run_coroutine_threadsafe(coro, self._hass.loop).result()
+
+    async def _async_request(self, session, method, url, timeout, endpoint, json_data=None):
+        """Send request and read reply, repeat once when server sends digest challenge"""
+        breaker = self._breakers[endpoint]
+        if not breaker.allow():
+            _LOGGER.debug('%s Circuit of %s is open, request is not sent', self, endpoint)
+            raise CommError
+        self._auth.requests += 1
+        self._api_calls.append(time.time())
+        #trimmed on every request, not only when diagnostics are read
+        self._prune_api_calls()
+        challenged = False
+        while True:
+            self._auth.round_trips += 1
+            try:
+                async with session.request(
+                        method,
+                        url,
+                        timeout=aiohttp.ClientTimeout(total=timeout),
+                        headers=self._auth.headers(method, url),
+                        json=json_data) as resp:
+                    resp_text = await resp.text()
+            except BaseException:
+                #any failure also releases probe of half-open circuit, not only timeout or connection error
+                self._breaker_failure(endpoint)
+                raise
+            if resp.status >= 500:
+                #server side failure, any other reply means endpoint is working
+                self._breaker_failure(endpoint)
+            else:
+                self._breaker_success(endpoint)
+            if challenged or not self._auth.challenge(resp.status, resp.headers):
+                #second challenge is final reply, server rotating nonces or wrong password must not loop
+                return resp, resp_text
+            challenged = True
+
+    def _check_circuit(self, endpoint):
+        """Raise before login when circuit of endpoint is open, so that nothing is sent while it is"""
+        if not self._breakers[endpoint].available:
+            _LOGGER.debug('%s Circuit of %s is open, request is not sent', self, endpoint)
+            raise CommError
+
+    def _breaker_failure(self, endpoint):
+        """Record failed request of endpoint, log and show when its circuit opens"""
+        breaker = self._breakers[endpoint]
+        opened = breaker.opened
+        breaker.failure()
+        if breaker.opened != opened:
+            _LOGGER.warning('%s Circuit of %s is open for %s seconds', self, endpoint, round(breaker.retry_in))
+            self._notify_diagnostics()
+            #half-open state comes with time, not with a request
+            async_call_later(self._hass, breaker.retry_in, self._breaker_half_open)
+
+    def _breaker_success(self, endpoint):
+        """Record successful request of endpoint, show when its circuit closes"""
+        breaker = self._breakers[endpoint]
+        was_closed = breaker.state == STATE_CLOSED
+        breaker.success()
+        if not was_closed:
+            _LOGGER.info('%s Circuit of %s is closed', self, endpoint)
+            self._notify_diagnostics()
+
+    @callback
+    def _breaker_half_open(self, now):
+        """Show circuit which lets probe through"""
+        self._notify_diagnostics()
+
+    @property
+    def breaker_states(self):
+        """Return state of circuit breaker of each endpoint."""
+        return {endpoint: breaker.state for endpoint, breaker in self._breakers.items()}
 
     def _login_session(self):
+        """Login to fetch Ariston Plant ID and confirm login"""
+        self._run_coroutine(self._async_login_session())
+
+    async def _async_login_session(self):
         """Login to fetch Ariston Plant ID and confirm login"""
         if not self._login:
+            await self.async_setup()
             url = self._url + '/Account/Login'
             try:
-                with self._token_lock:
-                    self._token = requests.auth.HTTPDigestAuth(
-                        self._user, self._password)
                 login_data = {"Email": self._user, "Password": self._password}
-                resp = self._session.post(
-                    url,
-                    auth=self._token,
-                    timeout=HTTP_TIMEOUT_LOGIN,
-                    json=login_data)
-            except requests.exceptions.ReadTimeout as error:
+                resp, _ = await self._async_request(self._read_session, "POST", url, HTTP_TIMEOUT_LOGIN, ENDPOINT_LOGIN, json_data=login_data)
+                resp_url = str(resp.url)
+            except asyncio.TimeoutError as error:
                 _LOGGER.warning('%s Authentication timeout', self)
+                self._login_backoff.failure()
                 raise CommError(error)
-            except LoginError:
-                _LOGGER.warning('%s Authentication login error', self)
-                raise
-            except CommError:
+            except aiohttp.ClientError as error:
                 _LOGGER.warning('%s Authentication communication error', self)
-                raise
-            if resp.url.startswith(self._url + "/PlantDashboard/Index/"):
+                self._login_backoff.failure()
+                raise CommError(error)
+            if resp_url.startswith(self._url + "/PlantDashboard/Index/"):
                 with self._plant_id_lock:
-                    self._plant_id = resp.url.split("/")[5]
+                    self._plant_id = resp_url.split("/")[5]
                     self._login = True
                     _LOGGER.info('%s Plant ID is %s', self, self._plant_id)
+                self._login_backoff.success()
+                await self._session_store.async_save(self._session_to_store())
+                #saving right away also cancels delayed save
+                self._saves_pending.discard(self._session_store)
             else:
                 _LOGGER.warning('%s Authentication login error', self)
+                self._login_backoff.failure()
                 raise LoginError
 
     def _get_http_data(self):
         """Get Ariston data from http"""
-        self._login_session()
+        self._run_coroutine(self._async_get_http_data())
+
+    async def _async_get_http_data(self):
+        """Get Ariston data from http, login again if stored session is rejected"""
+        self._check_circuit(ENDPOINT_GET)
+        session_restored = self._session_restored
+        self._session_restored = False
+        try:
+            changed = await self._async_fetch_http_data()
+        except AristonError:
+            if not session_restored:
+                raise
+            if not self._breakers[ENDPOINT_GET].available:
+                #stored session is tried again once circuit lets request through
+                self._session_restored = True
+                raise
+            _LOGGER.info('%s Stored session was rejected, logging in', self)
+            with self._plant_id_lock:
+                self._login = False
+            self._cookie_jar.clear()
+            changed = await self._async_fetch_http_data()
+        self._schedule_save(self._session_store, self._session_to_store)
+        return changed
+
+    async def _async_fetch_http_data(self):
+        """Get Ariston data from http"""
+        self._check_circuit(ENDPOINT_GET)
+        await self._async_login_session()
         if self._login and self._plant_id != "":
-            if time.time() - self._set_time_start > TIMER_SET_LOCK:
-                #give time to read new data
-                url = self._url + '/PlantDashboard/GetPlantData/' + self._plant_id
-                with self._data_lock:
-                    try:
-                        self._get_time_start = time.time()
-                        resp = self._session.get(
-                            url,
-                            auth=self._token,
-                            timeout=HTTP_TIMEOUT_GET,
-                            verify=self._verify)
-                        if resp.status_code == 599:
-                            _LOGGER.warning("%s Code %s, data is %s", self, resp.status_code, resp.text)
-                            raise CommError
-                        elif resp.status_code == 500:
-                            with self._plant_id_lock:
-                                self._login = False
-                            _LOGGER.warning("%s Code %s, data is %s", self, resp.status_code, resp.text)
-                            raise CommError
-                        elif resp.status_code != 200:
-                            _LOGGER.warning("%s Unexpected reply %s", self, resp.status_code)
-                            raise CommError
-                        resp.raise_for_status()
-                        #successful data fetching
-                        self._get_time_end = time.time()
-                        """
-                        #uncomment below to store request time
-                        f=open("/config/tmp/read_time.txt", "a+")
-                        f.write("{}\n".format(self._get_time_end - self._get_time_start))
-                        """
-                    except requests.RequestException as error:
-                        _LOGGER.warning("%s Failed due to error: %r", self, error)
-                        raise CommError(error)
-                    _LOGGER.info("%s Query worked. Exit code: <%s>", self, resp.status_code)
-                    try:
-                        self._ariston_data = copy.deepcopy(resp.json())
-                        """
-                        #uncomment below to log received data for troubleshooting purposes
-                        with open('/config/tmp/data.json', 'w') as ariston_fetched:
-                        json.dump(self._ariston_data, ariston_fetched)
-                        """
-                    except:
-                        with self._plant_id_lock:
-                                self._login = False
-                        _LOGGER.warning("%s Invalid data received, not JSON", self)
-                        raise CommError
-            else:
-                _LOGGER.debug("%s Setting data read restricted", self)
+            url = self._url + '/PlantDashboard/GetPlantData/' + self._plant_id
+            try:
+                self._get_time_start = time.time()
+                resp, resp_text = await self._async_request(self._read_session, "GET", url, HTTP_TIMEOUT_GET, ENDPOINT_GET)
+                if resp.status == 599:
+                    _LOGGER.warning("%s Code %s, data is %s", self, resp.status, resp_text)
+                    raise CommError
+                elif resp.status == 500:
+                    with self._plant_id_lock:
+                        self._login = False
+                    _LOGGER.warning("%s Code %s, data is %s", self, resp.status, resp_text)
+                    raise CommError
+                elif resp.status != 200:
+                    _LOGGER.warning("%s Unexpected reply %s", self, resp.status)
+                    raise CommError
+                resp.raise_for_status()
+                #successful data fetching
+                self._get_time_end = time.time()
+                """
+                #uncomment below to store request time
+                f=open("/config/tmp/read_time.txt", "a+")
+                f.write("{}\n".format(self._get_time_end - self._get_time_start))
+                """
+            except (asyncio.TimeoutError, aiohttp.ClientError) as error:
+                _LOGGER.warning("%s Failed due to error: %r", self, error)
+                raise CommError(error)
+            _LOGGER.info("%s Query worked. Exit code: <%s>", self, resp.status)
+            try:
+                data = self._parse_data(resp_text)
+                """
+                #uncomment below to log received data for troubleshooting purposes
+                with open('/config/tmp/data.json', 'w') as ariston_fetched:
+                json.dump(data, ariston_fetched)
+                """
+            except:
+                with self._plant_id_lock:
+                        self._login = False
+                _LOGGER.warning("%s Invalid data received, not JSON", self)
+                raise CommError
+            async with self._data_lock:
+                changed = self._store_data(data)
+                if self._set_time_start < self._get_time_start:
+                    #data was read after last change was sent
+                    changed.update(self._confirm_set_param())
+            return changed
         else:
             _LOGGER.warning("%s Not properly logged in to get data", self)
             raise LoginError
@@ -238,8 +723,8 @@ class AristonChecker():
     def _set_deroga_time(self):
         """Convert to 24H format if in 12H format"""
         try:
-            if isinstance(self._ariston_data["zone"]["derogaUntil"], str):
-                time_str_12h = self._ariston_data["zone"]["derogaUntil"]
+            if isinstance(self._server_data["zone"]["derogaUntil"], str):
+                time_str_12h = self._server_data["zone"]["derogaUntil"]
             else:
                 time_str_12h = DEFAULT_TIME
         except:
@@ -268,230 +753,488 @@ class AristonChecker():
             time_str_24h = DEFAULT_TIME
         return time_str_24h
 
-    def _actual_set_http_data(self, dummy=None):
-        self._login_session()
-        with self._data_lock:
-            if not self._set_new_data:
-                #scheduled setting
-                self._set_scheduled = False
-            else:
-                #initial setting
-                self._set_new_data = False
-                self._set_retry = 0
-            if self._login and self.available and self._plant_id != "":
-                url = self._url + '/PlantDashboard/SetPlantAndZoneData/' + self._plant_id + '?zoneNum=1&umsys=si'
-                data_changed = False
-                set_data = {}
-                set_data["NewValue"] = copy.deepcopy(self._ariston_data)
-                set_data["OldValue"] = copy.deepcopy(self._ariston_data)
-                # Format is received in 12H format but for some reason REST tools send it fine but python must send 24H format
-                set_data["NewValue"]["zone"]["derogaUntil"] = self._set_deroga_time()
-                set_data["OldValue"]["zone"]["derogaUntil"] = self._set_deroga_time()
-                if PARAM_MODE in self._set_param:
-                    if set_data["NewValue"]["mode"] == self._set_param[PARAM_MODE]:
-                        if self._set_time_start < self._get_time_end:
-                            #value should be up to date and match to remove from setting
-                            del self._set_param[PARAM_MODE]
-                        else:
-                            #assume data was not yet changed
-                            data_changed = True
-                    else:
-                        set_data["NewValue"]["mode"] = self._set_param[PARAM_MODE]
-                        data_changed = True
-                if PARAM_DHW_SET_TEMPERATURE in self._set_param:
-                    if set_data["NewValue"]["dhwTemp"]["value"] == self._set_param[PARAM_DHW_SET_TEMPERATURE]:
-                        if self._set_time_start < self._get_time_end:
-                            #value should be up to date and match to remove from setting
-                            del self._set_param[PARAM_DHW_SET_TEMPERATURE]
-                        else:
-                            #assume data was not yet changed
-                            data_changed = True
-                    else:
-                        set_data["NewValue"]["dhwTemp"]["value"] = self._set_param[PARAM_DHW_SET_TEMPERATURE]
-                        data_changed = True
-                if PARAM_CH_SET_TEMPERATURE in self._set_param:
-                    if set_data["NewValue"]["zone"]["comfortTemp"]["value"] == self._set_param[PARAM_CH_SET_TEMPERATURE]:
-                        if self._set_time_start < self._get_time_end:
-                            #value should be up to date and match to remove from setting
-                            del self._set_param[PARAM_CH_SET_TEMPERATURE]
-                        else:
-                            #assume data was not yet changed
-                            data_changed = True
-                    else:
-                        set_data["NewValue"]["zone"]["comfortTemp"]["value"] = self._set_param[PARAM_CH_SET_TEMPERATURE]
-                        data_changed = True
-                if PARAM_CH_MODE in self._set_param:
-                    if set_data["NewValue"]["zone"]["mode"]["value"] == self._set_param[PARAM_CH_MODE]:
-                        if self._set_time_start < self._get_time_end:
-                            #value should be up to date and match to remove from setting
-                            del self._set_param[PARAM_CH_MODE]
-                        else:
-                            #assume data was not yet changed
-                            data_changed = True
-                    else:
-                        set_data["NewValue"]["zone"]["mode"]["value"] = self._set_param[PARAM_CH_MODE]
-                        data_changed = True
-                if data_changed == True:
-                    if not self._set_scheduled:
-                        if self._set_retry < self._set_max_retries:
-                            #retry again after enough time to fetch data twice
-                            retry_time = dt_util.now() + timedelta(seconds=HTTP_SET_INTERVAL)
-                            track_point_in_time(self._hass, self._actual_set_http_data, retry_time)
-                            self._set_retry = self._set_retry + 1
-                            self._set_scheduled = True
-                        else:
-                            #no more retries, no need to keep changed data
-                            if PARAM_MODE in self._set_param:
-                                del self._set_param[PARAM_MODE]
-                            if PARAM_DHW_SET_TEMPERATURE in self._set_param:
-                                del self._set_param[PARAM_DHW_SET_TEMPERATURE]
-                            if PARAM_CH_SET_TEMPERATURE in self._set_param:
-                                del self._set_param[PARAM_CH_SET_TEMPERATURE]
-                            if PARAM_CH_MODE in self._set_param:
-                                del self._set_param[PARAM_CH_MODE]
-                    try:
-                        self._set_time_start = time.time()
-                        resp = self._session.post(
-                            url,
-                            auth=self._token,
-                            timeout=HTTP_TIMEOUT_SET,
-                            json=set_data)
-                        if resp.status_code != 200:
-                            _LOGGER.warning("%s Command to set data failed with code: %s", self, resp.status_code)
-                            raise CommError
-                        resp.raise_for_status()
-                        self._set_time_end = time.time()
-                        """
-                        #uncomment below to store request time
-                        request_time = time.time() - self._set_time_start
-                        f=open("/config/tmp/set_time.txt", "a+")
-                        f.write("{}\n".format(request_time))
-                        """
-                    except requests.exceptions.ReadTimeout as error:
-                        _LOGGER.warning('%s Request timeout', self)
-                        raise CommError(error)
-                    except CommError:
-                        _LOGGER.warning('%s Request communication error', self)
-                        raise
-                    #store data in reply, but note that in some cases in fact it is not set
-                    self._ariston_data = copy.deepcopy(resp.json())
-                    _LOGGER.info('%s Data was changed', self)
-                else:
-                    _LOGGER.debug('%s Same data was used', self)         
+    async def _async_actual_set_http_data(self, dummy=None):
+        """Set data ahead of any reading"""
+        await self._scheduler.async_write(self._async_write_http_data)
+
+    async def _async_write_http_data(self):
+        """Set Ariston data over http, each parameter is retried on its own schedule until confirmed"""
+        set_breaker = self._breakers[ENDPOINT_SET]
+        if set_breaker.available:
+            #no login nor fresh read while circuit is open, values are queued below
+            try:
+                await self._async_login_session()
+            except AristonError:
+                #pending values are sent again later, also when outage is too short to go offline
+                self._schedule_set_retry(max(BACKOFF_MIN, round(self._login_backoff.delay())))
+                raise
+        if set_breaker.available and self.available and time.time() - self._data_time > SET_FRESH_DATA_AGE:
+            #whole data is sent back, read it again so that changes made by other clients are not overwritten
+            try:
+                #fetch in progress is joined instead of racing it with another request
+                changed = await self.async_refresh(PRIORITY_CONFIRM)
+                if changed is None:
+                    #joined periodic fetch was postponed by this write
+                    changed = await self.async_refresh(PRIORITY_CONFIRM)
+            except AristonError:
+                changed = None
+            if changed is None:
+                _LOGGER.debug('%s Fresh data could not be read, last data is used', self)
             else:
-                #api is down
-                if not self._set_scheduled:
-                    if self._set_retry < self._set_max_retries:
-                        #retry again after enough time to fetch data twice
-                        retry_time = dt_util.now() + timedelta(seconds=HTTP_SET_INTERVAL)
-                        track_point_in_time(self._hass, self._actual_set_http_data, retry_time)
-                        self._set_retry = self._set_retry + 1
-                        self._set_scheduled = True
-                    else:
-                        #no more retries, no need to keep changed data
-                        if PARAM_MODE in self._set_param:
-                            del self._set_param[PARAM_MODE]
-                        if PARAM_DHW_SET_TEMPERATURE in self._set_param:
-                            del self._set_param[PARAM_DHW_SET_TEMPERATURE]
-                        if PARAM_CH_SET_TEMPERATURE in self._set_param:
-                            del self._set_param[PARAM_CH_SET_TEMPERATURE]
-                        if PARAM_CH_MODE in self._set_param:
-                            del self._set_param[PARAM_CH_MODE]
+                conflicts = changed & {field["path"] for param, field in WRITABLE_FIELDS.items() if param not in self._set_param}
+                if conflicts:
+                    self._set_conflicts_avoided += 1
+                    _LOGGER.info('%s Data %s was changed by other client, it is kept', self, sorted(conflicts))
+        async with self._data_lock:
+            online = self._login and self.available and self._plant_id != ""
+            #while circuit is open values are queued without using up their retries
+            sendable = online and set_breaker.available
+            now = time.time()
+            data_changed = False
+            unconfirmed = {}
+            for param, value in list(self._set_param.items()):
+                path = WRITABLE_FIELDS[param]["path"]
+                retry = self._set_retries[param]
+                if online and self._server_paths.get(path) == value and self._set_time_start < self._get_time_end:
+                    #value should be up to date and match to remove from setting
+                    self._drop_set_param(param)
+                    continue
+                if now > retry["deadline"]:
+                    #expired, also while offline
+                    unconfirmed[param] = value
+                    self._drop_set_param(param)
+                    continue
+                if not sendable:
+                    #kept in journal and sent once account is back online and circuit lets request through
+                    continue
+                if retry["time"] <= now:
+                    if retry["attempts"] > self._set_max_retries:
+                        #no more retries for this parameter, others are kept
+                        unconfirmed[param] = value
+                        self._drop_set_param(param)
+                        continue
+                    retry["attempts"] += 1
+                    retry["time"] = now + HTTP_SET_INTERVAL * 2 ** (retry["attempts"] - 1)
+                    data_changed = True
+            #confirmed and dropped values are no longer pending
+            self._notify_listeners(self._update_view())
+            self._log_rollback(unconfirmed)
+            if not set_breaker.available:
+                _LOGGER.info('%s Circuit of %s is open, setting data is queued', self, ENDPOINT_SET)
+                self._schedule_set_retry(max(set_breaker.retry_in, BACKOFF_MIN))
+                return
+            if not online:
                 _LOGGER.warning("%s No stable connection to set the data", self)
                 raise CommError
+            url = self._url + '/PlantDashboard/SetPlantAndZoneData/' + self._plant_id + '?zoneNum=1&umsys=si'
+            # Format is received in 12H format but for some reason REST tools send it fine but python must send 24H format
+            old_value = overlay_value(self._server_data, "zone.derogaUntil", self._set_deroga_time())
+            #data shown to entities already has all pending values, also those not yet due, so that request does not revert them
+            new_value = overlay_value(self._ariston_data, "zone.derogaUntil", old_value["zone"]["derogaUntil"])
+            #branches which are not changed are shared with stored data and only serialized
+            set_data = {"NewValue": new_value, "OldValue": old_value}
+            self._schedule_set_retry()
+            if not data_changed:
+                _LOGGER.debug('%s Same data was used', self)
+        if data_changed:
+            #request is sent without holding the lock so that reading is not blocked
+            try:
+                self._set_time_start = time.time()
+                resp, resp_text = await self._async_request(self._write_session, "POST", url, HTTP_TIMEOUT_SET, ENDPOINT_SET, json_data=set_data)
+                if resp.status != 200:
+                    _LOGGER.warning("%s Command to set data failed with code: %s", self, resp.status)
+                    raise CommError
+                resp.raise_for_status()
+                self._set_time_end = time.time()
+                """
+                #uncomment below to store request time
+                request_time = time.time() - self._set_time_start
+                f=open("/config/tmp/set_time.txt", "a+")
+                f.write("{}\n".format(request_time))
+                """
+            except asyncio.TimeoutError as error:
+                _LOGGER.warning('%s Request timeout', self)
+                raise CommError(error)
+            except aiohttp.ClientError as error:
+                _LOGGER.warning('%s Request communication error', self)
+                raise CommError(error)
+            except CommError:
+                _LOGGER.warning('%s Request communication error', self)
+                raise
+            #store data in reply, but note that in some cases in fact it is not set
+            async with self._data_lock:
+                changed = self._store_data(self._parse_data(resp_text))
+            _LOGGER.info('%s Data was changed', self)
+            self._notify_listeners(changed)
+            if self._set_param:
+                self._schedule_confirmation()
+
+    def _request_set_param(self, param, value, requested=None):
+        """Add value to be set and journal it, its retries start over"""
+        if requested is None:
+            requested = time.time()
+        #latest request supersedes earlier one and moves to the end of journal
+        self._set_param.pop(param, None)
+        self._set_param[param] = value
+        self._set_retries[param] = {
+            "attempts": 0,
+            "deadline": requested + SET_DEADLINE,
+            "requested": requested,
+            "time": 0,
+        }
+        self._journal_store.async_delay_save(self._journal_to_store, JOURNAL_SAVE_DELAY)
+
+    def _drop_set_param(self, param):
+        """Remove value which is confirmed or given up from journal"""
+        del self._set_param[param]
+        del self._set_retries[param]
+        self._journal_store.async_delay_save(self._journal_to_store, JOURNAL_SAVE_DELAY)
+
+    def _schedule_set_retry(self, delay=None):
+        """Schedule setting data when earliest pending parameter is due for retry or after given delay"""
+        if self._set_retry_unsub is not None:
+            self._set_retry_unsub()
+            self._set_retry_unsub = None
+        if self._set_retries:
+            if delay is None:
+                delay = min(retry["time"] for retry in self._set_retries.values()) - time.time()
+            self._set_retry_unsub = async_call_later(self._hass, max(delay, 0), self._async_retry_set_http_data)
+
+    async def _async_retry_set_http_data(self, dummy=None):
+        """Set data again for parameters due for retry"""
+        self._set_retry_unsub = None
+        await self._async_actual_set_http_data()
+
+    def _schedule_confirmation(self, step=0):
+        """Schedule read to confirm changes, earlier schedule is replaced"""
+        if self._confirm_unsub is not None:
+            self._confirm_unsub()
+        self._confirm_step = step
+        self._confirm_unsub = async_call_later(
+            self._hass, CONFIRM_INTERVALS[step], self._async_confirm_set_http_data)
+
+    async def _async_confirm_set_http_data(self, dummy=None):
+        """Read data until server shows all changes, then leave it to periodic fetching"""
+        self._confirm_unsub = None
+        if not self._set_param:
+            return
+        try:
+            await self.async_refresh(PRIORITY_CONFIRM)
+        except AristonError:
+            _LOGGER.debug('%s Confirmation read failed', self)
+        if self._set_param and self._confirm_step + 1 < len(CONFIRM_INTERVALS):
+            self._schedule_confirmation(self._confirm_step + 1)
 
     def _set_http_data(self, parameter_list={}):
+        """Set Ariston data over http after data verification"""
+        self._run_coroutine(self.async_set_http_data(parameter_list))
+
+    def _validate_set_param(self, field, wanted):
+        """Return value to be set for requested one, None if it is not supported"""
+        if "values" in field:
+            return field["values"].get(str(wanted).lower())
+        try:
+            value = round(float(wanted) / field["step"]) * field["step"]
+            if self._ariston_paths[field["min"]] <= value <= self._ariston_paths[field["max"]]:
+                return value
+        except (KeyError, OverflowError, TypeError, ValueError):
+            pass
+        return None
+
+    async def async_set_http_data(self, parameter_list={}):
         """Set Ariston data over http after data verification"""
         if self._ariston_data != {}:
-            url = self._url + '/PlantDashboard/SetPlantAndZoneData/' + self._plant_id + '?zoneNum=1&umsys=si'
-            with self._data_lock:
-                # check mode and set it
-                if PARAM_MODE in parameter_list:
-                    wanted_mode = str(parameter_list[PARAM_MODE]).lower()
-                    if wanted_mode in MODE_TO_VALUE:
-                        self._set_param[PARAM_MODE] = MODE_TO_VALUE[wanted_mode]
-                        _LOGGER.info('%s New mode %s', self, wanted_mode)
+            async with self._data_lock:
+                for param, field in WRITABLE_FIELDS.items():
+                    if param not in parameter_list:
+                        continue
+                    value = self._validate_set_param(field, parameter_list[param])
+                    if value is None:
+                        _LOGGER.warning('%s Not supported %s value: %s', self, param, parameter_list[param])
                     else:
-                        _LOGGER.warning('%s Unknown mode: %s', self, wanted_mode)
-                # check dhw temperature
-                if PARAM_DHW_SET_TEMPERATURE in parameter_list:
-                    wanted_dhw_temperature = str(parameter_list[PARAM_DHW_SET_TEMPERATURE]).lower()
-                    try:
-                        #round to nearest 1
-                        temperature = round(float(wanted_dhw_temperature))
-                        if temperature >= self._ariston_data["dhwTemp"]["min"] and temperature <= \
-                                self._ariston_data["dhwTemp"]["max"]:
-                            self._set_param[PARAM_DHW_SET_TEMPERATURE] = temperature
-                            _LOGGER.info('%s New DHW temperature %s', self, temperature)
-                        else:
-                            _LOGGER.warning('%s Not supported DHW temperature value: %s', self, wanted_dhw_temperature)
-                    except:
-                        _LOGGER.warning('%s Not supported DHW temperature value: %s', self, wanted_dhw_temperature)
-                        pass
-                # check CH temperature
-                if PARAM_CH_SET_TEMPERATURE in parameter_list:
-                    wanted_ch_temperature = str(parameter_list[PARAM_CH_SET_TEMPERATURE]).lower()
-                    try:
-                        #round to nearest 0.5
-                        temperature = round(float(wanted_ch_temperature) * 2.0) / 2.0
-                        if temperature >= self._ariston_data["zone"]["comfortTemp"]["min"] and temperature <= \
-                                self._ariston_data["zone"]["comfortTemp"]["max"]:
-                            self._set_param[PARAM_CH_SET_TEMPERATURE] = temperature
-                            _LOGGER.info('%s New CH temperature %s', self, temperature)
-                        else:
-                            _LOGGER.warning('%s Not supported CH temperature value: %s', self, wanted_ch_temperature)
-                    except:
-                        _LOGGER.warning('%s Not supported CH temperature value: %s', self, wanted_ch_temperature)
-                        pass
-                # check CH mode
-                if PARAM_CH_MODE in parameter_list:
-                    wanted_ch_mode = str(parameter_list[PARAM_CH_MODE]).lower()
-                    if wanted_ch_mode in CH_MODE_TO_VALUE:
-                        self._set_param[PARAM_CH_MODE] = CH_MODE_TO_VALUE[wanted_ch_mode]
-                        _LOGGER.info('%s New CH mode %s', self, wanted_ch_mode)
-                    else:
-                        _LOGGER.warning('%s Unknown mode: %s', self, wanted_ch_mode)
-                self._set_new_data = True
-            self._actual_set_http_data()
+                        self._request_set_param(param, value)
+                        _LOGGER.info('%s New %s %s', self, param, value)
+                #show requested values right away, they are reconciled with server data on fetch
+                changed = self._update_view()
+            self._notify_listeners(changed)
+            if not self._init_available:
+                #ranges were checked against stored data, set once live data is fetched
+                _LOGGER.info('%s Setting data delayed until live data is fetched', self)
+                return
+            if not self._device[CONF_SET_DEBOUNCE]:
+                await self._async_actual_set_http_data()
+                return
+            #wait for more changes to send all of them in one request
+            if self._set_debounce_unsub is not None:
+                self._set_debounce_unsub()
+                self._set_coalesced += 1
+            self._set_debounce_unsub = async_call_later(
+                self._hass, self._device[CONF_SET_DEBOUNCE], self._async_debounced_set_http_data)
         else:
             _LOGGER.warning("%s No valid data fetched from server to set changes", self)
             raise CommError
 
+    async def _async_debounced_set_http_data(self, dummy=None):
+        """Set all changes collected during debounce window"""
+        self._set_debounce_unsub = None
+        await self._async_actual_set_http_data()
+
     def command(self, dummy=None):
         """trigger fetching of data"""
-        with self._data_lock:
-            if self._errors >= MAX_ERRORS_TIMER_EXTEND:
-                #give a little rest to the system
-                self._retry_timeout = HTTP_RETRY_INTERVAL_DOWN
-                _LOGGER.warning('%s Retrying in %s seconds', self, self._retry_timeout)
-            else:
-                self._retry_timeout = HTTP_RETRY_INTERVAL
-                _LOGGER.debug('%s Fetching data in %s seconds', self, self._retry_timeout)
-            retry_time = dt_util.now() + timedelta(seconds=self._retry_timeout)
-            track_point_in_time(self._hass, self.command, retry_time)
+        self._run_coroutine(self.async_command())
+
+    async def async_command(self, dummy=None):
+        """trigger fetching of data"""
         try:
-            self._get_http_data()
+            await self.async_refresh(PRIORITY_PERIODIC)
+        finally:
+            #next fetch is planned with interval adapted to this one
+            async with self._data_lock:
+                if self._errors:
+                    #give a little rest to the system, accounts retry at random times after common outage
+                    backoff = self._login_backoff if self._login_backoff.failures else self._data_backoff
+                    self._backoff_until = time.time() + max(BACKOFF_MIN, round(backoff.delay()))
+                self._profile_name = self.polling_profile
+                self._retry_timeout = self._next_fetch_delay()
+                if self._errors:
+                    _LOGGER.warning('%s Retrying in %s seconds', self, self._retry_timeout)
+                else:
+                    _LOGGER.debug('%s Fetching data in %s seconds', self, self._retry_timeout)
+                self._schedule_command(self._retry_timeout)
+
+    def _next_fetch_delay(self, elapsed=0):
+        """Return seconds until next periodic fetch, errors keep their backoff and pause holds fetching until it ends"""
+        if self._errors:
+            delay = self._backoff_until - time.time()
+        else:
+            delay = max(self._poll_interval, self._poll_floor()) - elapsed
+            if self._burst_until:
+                if time.time() >= self._burst_until:
+                    self._burst_until = 0
+                    _LOGGER.info('%s Burst polling expired', self)
+                elif self.api_calls_last_hour >= self._device[CONF_HOURLY_BUDGET]:
+                    self._burst_until = 0
+                    _LOGGER.warning('%s Burst polling stopped, %s calls per hour used', self, self.api_calls_last_hour)
+                else:
+                    delay = min(delay, self._burst_interval - elapsed)
+        window_change = self._seconds_to_window_change()
+        if window_change is not None:
+            #profile is checked again once its time window starts or ends
+            delay = min(delay, window_change)
+        if self._pause_until > time.time():
+            #polling continues once pause expires
+            delay = self._pause_until - time.time()
+        return max(0, round(delay))
+
+    def _reschedule_command(self):
+        """Plan next periodic fetch again after polling settings changed"""
+        if self._command_unsub is not None:
+            #fetch in progress plans next one itself
+            self._retry_timeout = self._next_fetch_delay(time.time() - self._get_time_end)
+            self._schedule_command(self._retry_timeout)
+
+    @property
+    def api_calls_last_hour(self):
+        """Return number of requests sent during last hour"""
+        self._prune_api_calls()
+        return len(self._api_calls)
+
+    def _prune_api_calls(self):
+        """Forget requests older than an hour"""
+        hour_ago = time.time() - 3600
+        while self._api_calls and self._api_calls[0] < hour_ago:
+            self._api_calls.popleft()
+
+    @property
+    def burst_polling(self):
+        """Return True while burst polling is on"""
+        return self._burst_until > time.time()
+
+    @property
+    def polling_paused(self):
+        """Return True while periodic fetching is paused"""
+        return self._pause_until > time.time()
+
+    def burst_poll(self, interval, duration):
+        """Fetch data every interval seconds for duration seconds within hourly budget of requests"""
+        self._burst_interval = interval
+        self._burst_until = time.time() + duration
+        self._pause_until = 0
+        _LOGGER.info('%s Burst polling every %s seconds for %s seconds', self, interval, duration)
+        self._reschedule_command()
+
+    def pause_polling(self, duration):
+        """Stop periodic fetching for duration seconds, setting data and its confirmation are not stopped"""
+        self._pause_until = time.time() + duration
+        self._burst_until = 0
+        _LOGGER.info('%s Polling paused for %s seconds', self, duration)
+        self._reschedule_command()
+
+    def resume_polling(self):
+        """Resume periodic fetching after pause or burst"""
+        self._pause_until = 0
+        self._burst_until = 0
+        _LOGGER.info('%s Polling resumed', self)
+        self._reschedule_command()
+
+    def _schedule_command(self, delay):
+        """Plan next periodic fetch, earlier plan is replaced"""
+        if self._command_unsub is not None:
+            self._command_unsub()
+        self._next_fetch = dt_util.now() + timedelta(seconds=delay)
+        self._command_unsub = async_track_point_in_time(self._hass, self._async_scheduled_command, self._next_fetch)
+        self._notify_diagnostics()
+
+    async def _async_scheduled_command(self, dummy=None):
+        """Run planned periodic fetch"""
+        self._command_unsub = None
+        await self.async_command()
+
+    @property
+    def polling_profile(self):
+        """Return name of polling profile in effect"""
+        profile = self._polling_profile()
+        return profile[CONF_NAME] if profile else VAL_PROFILE_ACTIVE
+
+    def _polling_profile(self):
+        """Return profile set by service or first profile whose conditions match, None for default one"""
+        if self._profile_forced is not None:
+            return self._profiles.get(self._profile_forced)
+        now = dt_util.now()
+        for profile in self._profiles.values():
+            if CONF_START not in profile and CONF_ENTITY_ID not in profile:
+                #switched by service only
+                continue
+            if CONF_START in profile:
+                start, end, current = profile[CONF_START], profile[CONF_END], now.time()
+                if start <= end:
+                    in_window = start <= current < end
+                else:
+                    #window over midnight
+                    in_window = current >= start or current < end
+                if not in_window:
+                    continue
+            if CONF_ENTITY_ID in profile:
+                state = self._hass.states.get(profile[CONF_ENTITY_ID])
+                if state is None or state.state != profile[CONF_STATE]:
+                    continue
+            return profile
+        return None
+
+    def _seconds_to_window_change(self):
+        """Return seconds until nearest start or end of profile time window, None if there is none"""
+        now = dt_util.now()
+        seconds = None
+        for profile in self._profiles.values():
+            for window_time in (profile.get(CONF_START), profile.get(CONF_END)):
+                if window_time is None:
+                    continue
+                change = now.replace(
+                    hour=window_time.hour, minute=window_time.minute, second=window_time.second, microsecond=0)
+                if change <= now:
+                    change += timedelta(days=1)
+                delta = int((change - now).total_seconds()) + 1
+                seconds = delta if seconds is None else min(seconds, delta)
+        return seconds
+
+    def _poll_floor(self):
+        """Return shortest time between fetches for polling profile in effect"""
+        profile = self._polling_profile()
+        floor = self._device[CONF_POLL_INTERVAL_MIN]
+        return max(floor, profile[CONF_INTERVAL]) if profile else floor
+
+    @callback
+    def _profile_changed(self, *args):
+        """Plan next fetch again if polling profile changed"""
+        name = self.polling_profile
+        if name == self._profile_name:
+            return
+        _LOGGER.info('%s Polling profile %s', self, name)
+        self._profile_name = name
+        self._poll_interval = self._poll_floor()
+        if self._command_unsub is None:
+            #fetch in progress plans next one and notifies diagnostics then, profile is shown now
+            self._notify_diagnostics()
+        self._reschedule_command()
+
+    def set_polling_profile(self, name):
+        """Force polling profile by name, automatic selection for 'auto'"""
+        if name.lower() in (VAL_PROFILE_AUTO, VAL_PROFILE_ACTIVE):
+            #only keywords are case insensitive, configured names are kept as they are
+            name = name.lower()
+        elif name not in self._profiles:
+            _LOGGER.warning('%s Unknown polling profile: %s', self, name)
+            raise AristonError
+        self._profile_forced = None if name == VAL_PROFILE_AUTO else name
+        self._profile_changed()
+
+    def _adapt_poll_interval(self, changed):
+        """Fetch as often as allowed while boiler is active, back off step by step while nothing changes"""
+        floor = self._poll_floor()
+        ceiling = max(floor, self._device[CONF_POLL_INTERVAL_MAX])
+        if self._set_param or not changed.isdisjoint(ACTIVITY_PATHS):
+            self._poll_interval = floor
+        else:
+            self._poll_interval = min(ceiling, round(self._poll_interval * POLL_BACKOFF))
+
+    async def async_refresh(self, priority=PRIORITY_CONFIRM):
+        """Fetch data now, joining fetch in progress instead of sending another request, return changed paths, None if it was postponed"""
+        if self._refresh_task is None:
+            self._refresh_task = self._hass.async_create_task(self._async_refresh(priority))
+            self._refresh_task.add_done_callback(self._refresh_done)
+        else:
+            self._fetch_calls_saved += 1
+            _LOGGER.debug('%s Joining data fetch in progress', self)
+        return await asyncio.shield(self._refresh_task)
+
+    def _refresh_done(self, task):
+        """Allow new fetch once fetch in progress is finished"""
+        self._refresh_task = None
+
+    async def _async_refresh(self, priority):
+        """Fetch data and update availability, return changed paths"""
+        try:
+            changed = await self._scheduler.async_read(priority, self._async_get_http_data)
+            if changed is None:
+                #reading was postponed while setting data
+                return
         except AristonError:
             with self._lock:
                 was_online = self.available
                 self._errors += 1
                 _LOGGER.warning("%s errors: %i", self._name, self._errors)
+                if not self._login_backoff.failures:
+                    #login failures have own schedule
+                    self._data_backoff.failure()
                 offline = not self.available
             if offline and was_online:
                 with self._plant_id_lock:
                     self._login = False
                 _LOGGER.error("%s is offline: Too many errors", self._name)
-                dispatcher_send(self._hass, service_signal(SERVICE_UPDATE, self._name))
+                self._notify_listeners()
             raise
         with self._lock:
             was_offline = not self.available
+            was_stored = not self._init_available
             self._errors = 0
             self._init_available = True
+            self._data_backoff.success()
+        self._adapt_poll_interval(changed)
         if was_offline:
             _LOGGER.info("%s Ariston back online", self._name)
-            dispatcher_send(self._hass, service_signal(SERVICE_UPDATE, self._name))
+            self._notify_listeners()
+        elif was_stored:
+            #drop attributes of stored data
+            self._notify_listeners()
+        elif changed:
+            self._notify_listeners(changed)
+        if self._set_param and (
+                was_stored or was_offline or (self._set_retry_unsub is None and not self._scheduler.write_pending)):
+            #changes requested before live data was available, while offline or left without retry after failure
+            self._hass.async_create_task(self._async_actual_set_http_data())
+        return changed
 
-def setup(hass, config):
+async def async_setup(hass, config):
     """Set up the Ariston component."""
     hass.data.setdefault(DATA_ARISTON, {DEVICES: {}, CLIMATES: [], WATER_HEATERS: []})
     api_list = []
@@ -501,56 +1244,72 @@ def setup(hass, config):
         password = device[CONF_PASSWORD]
         retries = device[CONF_MAX_RETRIES]
         entity_id = "climate."+name
-        try:
-            api = AristonChecker(hass, device=device, name=name, username=username, password=password, retries=retries)
-            api_list.append(api)
-            api.command()
-        except LoginError as ex:
-            _LOGGER.error("Login error for %s: %s", name, ex)
-            pass
-        except AristonError as ex:
-            _LOGGER.error("Communication error for %s: %s", name, ex)
-            pass
+        api = AristonChecker(hass, device=device, name=name, username=username, password=password, retries=retries)
+        api_list.append(api)
+        await api.async_setup()
         binary_sensors = device.get(CONF_BINARY_SENSORS)
         sensors = device.get(CONF_SENSORS)
         switches = device.get(CONF_SWITCHES)
         hass.data[DATA_ARISTON][DEVICES][name] = AristonDevice(api)
-        discovery.load_platform(
+        hass.async_create_task(discovery.async_load_platform(
             hass, CLIMATE,
             DOMAIN,
             {CONF_NAME: name},
-            config)
-        discovery.load_platform(
+            config))
+        hass.async_create_task(discovery.async_load_platform(
             hass, WATER_HEATER,
             DOMAIN,
             {CONF_NAME: name},
-            config)
+            config))
         if switches:
-            discovery.load_platform(
+            hass.async_create_task(discovery.async_load_platform(
                 hass,
                 SWITCH,
                 DOMAIN,
                 {CONF_NAME: name, CONF_SWITCHES: switches},
                 config,
-            )
+            ))
         if binary_sensors:
-            discovery.load_platform(
+            hass.async_create_task(discovery.async_load_platform(
                 hass,
                 BINARY_SENSOR,
                 DOMAIN,
                 {CONF_NAME: name, CONF_BINARY_SENSORS: binary_sensors},
                 config,
-            )
+            ))
         if sensors:
-            discovery.load_platform(
+            hass.async_create_task(discovery.async_load_platform(
                 hass,
                 SENSOR,
                 DOMAIN,
                 {CONF_NAME: name, CONF_SENSORS: sensors},
                 config
-            )
+            ))
 
-    def set_ariston_data(call):
+    setup_semaphore = asyncio.Semaphore(SETUP_CONCURRENCY)
+
+    async def async_first_fetch(api):
+        """Login and fetch first data in background, entities become available when data lands"""
+        async with setup_semaphore:
+            try:
+                await api.async_command()
+            except LoginError as ex:
+                _LOGGER.error("Login error for %s: %s", api._name, ex)
+            except AristonError as ex:
+                _LOGGER.error("Communication error for %s: %s", api._name, ex)
+
+    @callback
+    def async_start_first_fetch(event=None):
+        """Start first fetches once Home Assistant is running, so that bootstrap does not wait for them"""
+        for api in api_list:
+            hass.async_create_task(async_first_fetch(api))
+
+    if hass.state == CoreState.running:
+        async_start_first_fetch()
+    else:
+        hass.bus.async_listen_once(EVENT_HOMEASSISTANT_START, async_start_first_fetch)
+
+    async def set_ariston_data(call):
         """Handle the service call."""
         entity_id = call.data.get(ATTR_ENTITY_ID, "")
         try:
@@ -569,22 +1328,13 @@ def setup(hass, config):
         for api in api_list:
             if api._name.lower() == device.lower():
                 try:
-                    with api._data_lock:
-                        parameter_list = {}
-                        data = call.data.get(PARAM_MODE, "")
-                        if data != "":
-                            parameter_list[PARAM_MODE] = data
-                        data = call.data.get(PARAM_CH_MODE, "")
-                        if data != "":
-                            parameter_list[PARAM_CH_MODE] = data
-                        data = call.data.get(PARAM_CH_SET_TEMPERATURE, "")
+                    parameter_list = {}
+                    for param in WRITABLE_FIELDS:
+                        data = call.data.get(param, "")
                         if data != "":
-                            parameter_list[PARAM_CH_SET_TEMPERATURE] = data
-                        data = call.data.get(PARAM_DHW_SET_TEMPERATURE, "")
-                        if data != "":
-                            parameter_list[PARAM_DHW_SET_TEMPERATURE] = data
+                            parameter_list[param] = data
                     _LOGGER.debug("device found")
-                    api._set_http_data(parameter_list)
+                    await api.async_set_http_data(parameter_list)
                 except CommError:
                     _LOGGER.warning("Communication error for Ariston")
                     raise
@@ -593,7 +1343,38 @@ def setup(hass, config):
         raise AristonError
         return
 
-    hass.services.register(DOMAIN, SERVICE_SET_DATA, set_ariston_data)
+    hass.services.async_register(DOMAIN, SERVICE_SET_DATA, set_ariston_data)
+
+    def find_api(call):
+        """Return account of climate entity in service call."""
+        entity_id = call.data.get(ATTR_ENTITY_ID, "")
+        device = entity_id.split(".")[-1]
+        for api in api_list:
+            if api._name.lower() == device.lower():
+                return api
+        _LOGGER.warning("Entity %s not found", entity_id)
+        raise AristonError
+
+    async def set_polling_profile(call):
+        """Handle the service call."""
+        find_api(call).set_polling_profile(call.data[PARAM_PROFILE])
+
+    async def burst_poll(call):
+        """Handle the service call."""
+        find_api(call).burst_poll(call.data[PARAM_INTERVAL], call.data[PARAM_DURATION])
+
+    async def pause_polling(call):
+        """Handle the service call."""
+        find_api(call).pause_polling(call.data[PARAM_DURATION])
+
+    async def resume_polling(call):
+        """Handle the service call."""
+        find_api(call).resume_polling()
+
+    hass.services.async_register(DOMAIN, SERVICE_SET_POLLING_PROFILE, set_polling_profile, schema=SET_POLLING_PROFILE_SCHEMA)
+    hass.services.async_register(DOMAIN, SERVICE_BURST_POLL, burst_poll, schema=BURST_POLL_SCHEMA)
+    hass.services.async_register(DOMAIN, SERVICE_PAUSE_POLLING, pause_polling, schema=PAUSE_POLLING_SCHEMA)
+    hass.services.async_register(DOMAIN, SERVICE_RESUME_POLLING, resume_polling, schema=RESUME_POLLING_SCHEMA)
 
     if not hass.data[DATA_ARISTON][DEVICES]:
         return False
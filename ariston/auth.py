@@ -0,0 +1,94 @@
+"""Authentication strategy for Ariston."""
+import hashlib
+import os
+import time
+
+from yarl import URL
+
+AUTH_MODE_COOKIE = "cookie"
+AUTH_MODE_DIGEST = "digest"
+
+
+def _md5(text):
+    """Return hex MD5 digest of text."""
+    return hashlib.md5(text.encode("utf-8")).hexdigest()
+
+
+def parse_challenge(header):
+    """Parse 'WWW-Authenticate: Digest ...' header into dictionary."""
+    challenge = {}
+    for item in header[len("digest"):].split(","):
+        key, _, value = item.strip().partition("=")
+        if key:
+            challenge[key.lower()] = value.strip('"')
+    return challenge
+
+
+class AristonAuth:
+    """Rely on session cookie until server sends digest challenge, then reuse its nonce."""
+
+    def __init__(self, username, password):
+        """Initialize."""
+        self._challenge = None
+        self._nonce_count = 0
+        self._password = password
+        self._username = username
+        self.challenges = 0
+        self.requests = 0
+        self.round_trips = 0
+
+    @property
+    def mode(self):
+        """Return current authentication mode."""
+        return AUTH_MODE_DIGEST if self._challenge else AUTH_MODE_COOKIE
+
+    @property
+    def round_trips_per_request(self):
+        """Return average number of HTTP round trips per request."""
+        if not self.requests:
+            return 0
+        return round(self.round_trips / self.requests, 2)
+
+    def headers(self, method, url):
+        """Return authorization headers for request, empty in cookie mode."""
+        if self._challenge is None:
+            return {}
+        self._nonce_count += 1
+        realm = self._challenge.get("realm", "")
+        nonce = self._challenge.get("nonce", "")
+        uri = URL(url).raw_path_qs
+        ha1 = _md5(f"{self._username}:{realm}:{self._password}")
+        ha2 = _md5(f"{method}:{uri}")
+        header = (
+            f'Digest username="{self._username}", realm="{realm}", '
+            f'nonce="{nonce}", uri="{uri}"'
+        )
+        if "auth" in self._challenge.get("qop", "").split(","):
+            nonce_count = f"{self._nonce_count:08x}"
+            cnonce = _md5(f"{nonce}:{time.time()}:{os.urandom(8).hex()}")[:16]
+            response = _md5(f"{ha1}:{nonce}:{nonce_count}:{cnonce}:auth:{ha2}")
+            header += f', qop=auth, nc={nonce_count}, cnonce="{cnonce}"'
+        else:
+            response = _md5(f"{ha1}:{nonce}:{ha2}")
+        header += f', response="{response}", algorithm=MD5'
+        if "opaque" in self._challenge:
+            header += f', opaque="{self._challenge["opaque"]}"'
+        return {"Authorization": header}
+
+    def challenge(self, status, headers):
+        """Store digest challenge from reply, return True if request shall be repeated with it."""
+        header = headers.get("WWW-Authenticate", "")
+        if status != 401 or not header.lower().startswith("digest"):
+            return False
+        challenge = parse_challenge(header)
+        self.challenges += 1
+        if (
+            self._challenge is not None
+            and self._challenge.get("nonce") == challenge.get("nonce")
+            and challenge.get("stale", "").lower() != "true"
+        ):
+            # same nonce was rejected, credentials are wrong and repeating is useless
+            return False
+        self._challenge = challenge
+        self._nonce_count = 0
+        return True
@@ -1,5 +1,4 @@
 """Suppoort for Ariston binary sensors."""
-from datetime import timedelta
 import logging
 
 from homeassistant.components.binary_sensor import (
@@ -8,31 +7,25 @@ from homeassistant.components.binary_sensor import (
     BinarySensorDevice,
 )
 from homeassistant.const import CONF_BINARY_SENSORS, CONF_NAME
-from homeassistant.helpers.dispatcher import async_dispatcher_connect
+from homeassistant.core import callback
 
 from .const import (
     DATA_ARISTON,
     DEVICES,
-    SERVICE_UPDATE,
     PARAM_HOLIDAY_MODE,
     PARAM_ONLINE,
     PARAM_FLAME,
 )
-from .helpers import log_update_error, service_signal
+from .helpers import log_update_error
 from .exceptions import AristonError
 
-"""BINARY_SENSOR_SCAN_INTERVAL_SECS is used to scan changes in JSON data as command in '__init__' is not for checking and updating sensors"""
-BINARY_SENSOR_SCAN_INTERVAL_SECS = 3
-
-SCAN_INTERVAL = timedelta(seconds=BINARY_SENSOR_SCAN_INTERVAL_SECS)
-
 _LOGGER = logging.getLogger(__name__)
 
-# Binary sensor types are defined like: Name, device class
+# Binary sensor types are defined like: Name, device class, icon, data paths (None for all data)
 BINARY_SENSORS = {
-    PARAM_HOLIDAY_MODE: ("Hiliday Mode", None, "mdi:island"),
-    PARAM_ONLINE: ("Online", DEVICE_CLASS_CONNECTIVITY, None),
-    PARAM_FLAME: ("Flame", DEVICE_CLASS_HEAT, None),
+    PARAM_HOLIDAY_MODE: ("Hiliday Mode", None, "mdi:island", ["zone.comfortTemp.value", "zone.antiFreezeTemp", "holidayEnabled"]),
+    PARAM_ONLINE: ("Online", DEVICE_CLASS_CONNECTIVITY, None, None),
+    PARAM_FLAME: ("Flame", DEVICE_CLASS_HEAT, None, ["flameSensor"]),
 }
 
 async def async_setup_platform(hass, config, async_add_entities, discovery_info=None):
@@ -61,20 +54,23 @@ class AristonBinarySensor(BinarySensorDevice):
         self._device_class = BINARY_SENSORS[sensor_type][1]
         self._icon = BINARY_SENSORS[sensor_type][2]
         self._name = "{} {}".format(name, BINARY_SENSORS[sensor_type][0])
+        self._paths = BINARY_SENSORS[sensor_type][3]
         self._sensor_type = sensor_type
         self._signal_name = name
         self._state = None
-        self._unsub_dispatcher = None
+        self._unsub_listener = None
 
     @property
     def device_state_attributes(self):
         """Return the state attributes."""
-        return self._attrs
+        attrs = dict(self._attrs)
+        attrs.update(self._api.entity_attributes(self._paths))
+        return attrs
 
     @property
     def should_poll(self):
-        """Return True if entity has to be polled for state."""
-        return self._sensor_type != PARAM_ONLINE
+        """Return False as entity is updated by new data from API."""
+        return False
 
     @property
     def name(self):
@@ -120,6 +116,31 @@ class AristonBinarySensor(BinarySensorDevice):
 
             elif self._sensor_type == PARAM_ONLINE:
                 self._state = self._api.available
+                self._attrs["State writes"] = self._api._state_writes
+                self._attrs["Last state writes"] = self._api._state_writes_last
+                self._attrs["Auth mode"] = self._api._auth.mode
+                self._attrs["Auth challenges"] = self._api._auth.challenges
+                self._attrs["Round trips per request"] = self._api._auth.round_trips_per_request
+                self._attrs["Lock hold max ms"] = round(self._api._data_lock.hold_time_max * 1000, 1)
+                self._attrs["Lock wait max ms"] = round(self._api._data_lock.wait_time_max * 1000, 1)
+                self._attrs["Fetch calls saved"] = self._api._fetch_calls_saved
+                self._attrs["Set calls coalesced"] = self._api._set_coalesced
+                self._attrs["Set conflicts avoided"] = self._api._set_conflicts_avoided
+                self._attrs["Queue depth"] = self._api._scheduler.queue_depth
+                self._attrs["Queue wait max ms"] = round(self._api._scheduler.wait_time_max * 1000, 1)
+                self._attrs["Reads postponed"] = self._api._scheduler.reads_dropped
+                self._attrs["Poll interval s"] = self._api._retry_timeout
+                self._attrs["Login failures"] = self._api._login_backoff.failures
+                self._attrs["Fetch failures"] = self._api._data_backoff.failures
+                self._attrs["Polling profile"] = self._api.polling_profile
+                self._attrs["Next fetch"] = self._api._next_fetch.isoformat() if self._api._next_fetch else None
+                self._attrs["Calls last hour"] = self._api.api_calls_last_hour
+                self._attrs["Burst polling"] = self._api.burst_polling
+                self._attrs["Polling paused"] = self._api.polling_paused
+                self._attrs["Circuit breakers"] = self._api.breaker_states
+                self._attrs["Last confirmation s"] = self._api._confirm_time_last
+                self._attrs["Snapshot bytes"] = self._api.snapshot_size
+                self._attrs["Snapshot ms"] = round(self._api._snapshot_time * 1000, 1)
             
             elif self._sensor_type == PARAM_FLAME:
                 try:
@@ -130,18 +151,16 @@ class AristonBinarySensor(BinarySensorDevice):
         except AristonError as error:
             log_update_error(_LOGGER, "update", self.name, "binary sensor", error)
 
-    async def async_on_demand_update(self):
-        """Update state."""
-        self.async_schedule_update_ha_state(True)
+    @callback
+    def async_on_demand_update(self):
+        """Update state from API data in memory, without executor job."""
+        self.update()
+        self.async_write_ha_state()
 
     async def async_added_to_hass(self):
-        """Subscribe to update signal."""
-        self._unsub_dispatcher = async_dispatcher_connect(
-            self.hass,
-            service_signal(SERVICE_UPDATE, self._signal_name),
-            self.async_on_demand_update,
-        )
+        """Subscribe to data updates."""
+        self._unsub_listener = self._api.add_listener(self.async_on_demand_update, self._paths)
 
     async def async_will_remove_from_hass(self):
-        """Disconnect from update signal."""
-        self._unsub_dispatcher()
\ No newline at end of file
+        """Disconnect from data updates."""
+        self._unsub_listener()
\ No newline at end of file
@@ -0,0 +1,72 @@
+"""Circuit breaker for Ariston endpoints."""
+import time
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """Stop sending requests to failing endpoint, after reset time let single probe through.
+
+    Breaker opens after threshold of failures in a row. While it is open no
+    request is allowed. Once reset time passes it is half-open: one probe
+    request is allowed, its success closes breaker and its failure opens it
+    again for another reset time.
+    """
+
+    def __init__(self, threshold, reset_time):
+        """Initialize."""
+        self._failures = 0
+        self._opened = 0
+        self._probe = False
+        self._reset_time = reset_time
+        self._threshold = threshold
+        self.opened = 0
+
+    @property
+    def state(self):
+        """Return current state of breaker."""
+        if self._failures < self._threshold:
+            return STATE_CLOSED
+        if time.monotonic() - self._opened < self._reset_time:
+            return STATE_OPEN
+        return STATE_HALF_OPEN
+
+    @property
+    def retry_in(self):
+        """Return seconds until breaker lets probe through."""
+        if self.state != STATE_OPEN:
+            return 0
+        return self._reset_time - (time.monotonic() - self._opened)
+
+    @property
+    def available(self):
+        """Return True if request would be allowed now, without taking probe."""
+        state = self.state
+        return state == STATE_CLOSED or (state == STATE_HALF_OPEN and not self._probe)
+
+    def allow(self):
+        """Return True if request may be sent, in half-open state only first caller is allowed as probe."""
+        state = self.state
+        if state == STATE_CLOSED:
+            return True
+        if state == STATE_OPEN or self._probe:
+            return False
+        self._probe = True
+        return True
+
+    def success(self):
+        """Record successful request, breaker closes."""
+        self._failures = 0
+        self._probe = False
+
+    def failure(self):
+        """Record failed request, breaker opens after threshold or failed probe."""
+        was_probe = self._probe
+        self._probe = False
+        self._failures += 1
+        if was_probe or self._failures == self._threshold:
+            self._failures = max(self._failures, self._threshold)
+            self._opened = time.monotonic()
+            self.opened += 1
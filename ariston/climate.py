@@ -1,7 +1,6 @@
 """
 Adds support for the Ariston Boiler
 """
-from datetime import timedelta
 import logging
 
 from homeassistant.components.climate import ClimateDevice
@@ -20,6 +19,7 @@ from homeassistant.const import (
     CONF_NAME,
     TEMP_CELSIUS,
 )
+from homeassistant.core import callback
 
 from .const import (
     CONF_HVAC_OFF,
@@ -43,16 +43,12 @@ DEFAULT_MIN = 10.0
 DEFAULT_MAX = 30.0
 DEFAULT_TEMP = 0.0
 
-"""STATE_SCAN_INTERVAL_SECS is used to scan changes in JSON data as command in '__init__' is not for checking and updating sensors"""
-STATE_SCAN_INTERVAL_SECS = 3
-
 _LOGGER = logging.getLogger(__name__)
 
-SCAN_INTERVAL = timedelta(seconds=STATE_SCAN_INTERVAL_SECS)
-
 SUPPORT_FLAGS = SUPPORT_PRESET_MODE | SUPPORT_TARGET_TEMPERATURE
 SUPPORTED_HVAC_MODES = [HVAC_MODE_HEAT, HVAC_MODE_OFF, HVAC_MODE_AUTO]
 SUPPORTED_PRESETS = [VAL_MODE_SUMMER, VAL_MODE_WINTER, VAL_MODE_OFF]
+DATA_PATHS = ["mode", "flameSensor", "holidayEnabled", "zone.mode", "zone.roomTemp", "zone.comfortTemp", "zone.antiFreezeTemp"]
 
 def setup_platform(hass, config, add_entities, discovery_info=None):
     """Setup the Ariston Platform."""
@@ -71,6 +67,7 @@ class AristonThermostat(ClimateDevice):
         """Initialize the thermostat."""
         self._name = name
         self._api = device.api
+        self._unsub_listener = None
 
     @property
     def icon(self):
@@ -87,10 +84,15 @@ class AristonThermostat(ClimateDevice):
         """Return the unique ID for this thermostat."""
         return '_'.join([self._name, 'climate'])
 
+    @property
+    def device_state_attributes(self):
+        """Return the state attributes."""
+        return self._api.entity_attributes(DATA_PATHS)
+
     @property
     def should_poll(self):
-        """Polling is required."""
-        return True
+        """Return False as entity is updated by new data from API."""
+        return False
 
     @property
     def min_temp(self):
@@ -229,4 +231,17 @@ class AristonThermostat(ClimateDevice):
 
     def update(self):
         """Update all Node data from Hive."""
-        return
\ No newline at end of file
+        return
+
+    @callback
+    def async_on_demand_update(self):
+        """Update state, it is read from API data so no update job is needed."""
+        self.async_write_ha_state()
+
+    async def async_added_to_hass(self):
+        """Subscribe to data updates."""
+        self._unsub_listener = self._api.add_listener(self.async_on_demand_update, DATA_PATHS)
+
+    async def async_will_remove_from_hass(self):
+        """Disconnect from data updates."""
+        self._unsub_listener()
\ No newline at end of file
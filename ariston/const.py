@@ -3,6 +3,10 @@ DOMAIN = "ariston"
 DATA_ARISTON = DOMAIN
 DEVICES = "devices"
 SERVICE_SET_DATA = "set_data"
+SERVICE_BURST_POLL = "burst_poll"
+SERVICE_PAUSE_POLLING = "pause_polling"
+SERVICE_RESUME_POLLING = "resume_polling"
+SERVICE_SET_POLLING_PROFILE = "set_polling_profile"
 SERVICE_UPDATE = "update"
 CLIMATES = "climates"
 WATER_HEATERS = "water_heaters"
@@ -11,11 +15,14 @@ PARAM_CH_ANTIFREEZE_TEMPERATURE = "ch_antifreeze_temperature"
 PARAM_CH_MODE = "ch_mode"
 PARAM_CH_SET_TEMPERATURE = "ch_set_temperature"
 PARAM_DETECTED_TEMPERATURE = "detected_temperature"
+PARAM_DURATION = "duration"
 PARAM_DHW_SET_TEMPERATURE = "dhw_set_temperature"
 PARAM_HOLIDAY_MODE = "holiday_mode"
+PARAM_INTERVAL = "interval"
 PARAM_MODE = "mode"
 PARAM_ONLINE = "online"
 PARAM_FLAME = "flame"
+PARAM_PROFILE = "profile"
 
 VAL_MODE_WINTER = "winter"
 VAL_MODE_SUMMER = "summer"
@@ -25,12 +32,52 @@ VAL_CH_MODE_SCHEDULED = "scheduled"
 VAL_UNKNOWN = "unknown"
 VAL_OFFLINE = "offline"
 VAL_HOLIDAY = "holiday"
+VAL_PROFILE_ACTIVE = "active"
+VAL_PROFILE_AUTO = "auto"
 
 CONF_HVAC_OFF = "hvac_off"
 CONF_POWER_ON = "power_on"
 CONF_MAX_RETRIES = "max_retries"
+CONF_POOL_SIZE = "pool_size"
+CONF_KEEPALIVE = "keepalive"
+CONF_SET_DEBOUNCE = "set_debounce"
+CONF_POLL_INTERVAL_MIN = "poll_interval_min"
+CONF_POLL_INTERVAL_MAX = "poll_interval_max"
+CONF_POLLING_PROFILES = "polling_profiles"
+CONF_INTERVAL = "interval"
+CONF_START = "start"
+CONF_END = "end"
+CONF_HOURLY_BUDGET = "hourly_budget"
+CONF_BREAKER_THRESHOLD = "breaker_threshold"
+CONF_BREAKER_RESET = "breaker_reset"
 
 MODE_TO_VALUE = {VAL_MODE_WINTER: 1, VAL_MODE_SUMMER: 0, VAL_MODE_OFF: 5}
 VALUE_TO_MODE = {1: VAL_MODE_WINTER, 0: VAL_MODE_SUMMER, 5: VAL_MODE_OFF}
 CH_MODE_TO_VALUE = {VAL_CH_MODE_MANUAL: 2, VAL_CH_MODE_SCHEDULED: 3}
-VALUE_TO_CH_MODE = {2: VAL_CH_MODE_MANUAL, 3: VAL_CH_MODE_SCHEDULED}
\ No newline at end of file
+VALUE_TO_CH_MODE = {2: VAL_CH_MODE_MANUAL, 3: VAL_CH_MODE_SCHEDULED}
+
+# Writable fields: "path" is dotted path of value in plant data, requested value is
+# either mapped by "values" or rounded to "step" and checked against values at
+# "min" and "max" paths. New field to be set needs only new row.
+WRITABLE_FIELDS = {
+    PARAM_MODE: {
+        "path": "mode",
+        "values": MODE_TO_VALUE,
+    },
+    PARAM_DHW_SET_TEMPERATURE: {
+        "path": "dhwTemp.value",
+        "step": 1,
+        "min": "dhwTemp.min",
+        "max": "dhwTemp.max",
+    },
+    PARAM_CH_SET_TEMPERATURE: {
+        "path": "zone.comfortTemp.value",
+        "step": 0.5,
+        "min": "zone.comfortTemp.min",
+        "max": "zone.comfortTemp.max",
+    },
+    PARAM_CH_MODE: {
+        "path": "zone.mode.value",
+        "values": CH_MODE_TO_VALUE,
+    },
+}
@@ -1,6 +1,13 @@
 """Helpers for amcrest component."""
+import asyncio
+import random
+import sys
+import time
+
 from .const import DOMAIN
 
+_MISSING = object()
+
 
 def service_signal(service, ident=None):
     """Encode service and identifier into signal."""
@@ -19,3 +26,119 @@ def log_update_error(logger, action, name, entity_type, error):
         entity_type,
         error.__class__.__name__,
     )
+
+
+def flatten_data(data):
+    """Flatten JSON data into dictionary of dotted paths and leaf values."""
+    flat = {}
+    stack = [("", data)]
+    while stack:
+        prefix, value = stack.pop()
+        if isinstance(value, dict) and value:
+            for key, item in value.items():
+                stack.append((prefix + "." + key if prefix else key, item))
+        else:
+            flat[prefix] = value
+    return flat
+
+
+class FrozenDict(dict):
+    """Dictionary which can not be changed, so that snapshot can be shared by reference."""
+
+    def _read_only(self, *args, **kwargs):
+        """Refuse change."""
+        raise TypeError("data snapshot is read-only")
+
+    __setitem__ = __delitem__ = __ior__ = _read_only
+    clear = pop = popitem = setdefault = update = _read_only
+
+
+def freeze_data(data):
+    """Return read-only copy of JSON data."""
+    if isinstance(data, dict):
+        return FrozenDict((key, freeze_data(value)) for key, value in data.items())
+    if isinstance(data, list):
+        return [freeze_data(item) for item in data]
+    return data
+
+
+def data_size(data):
+    """Return approximate number of bytes retained by JSON data."""
+    size = 0
+    stack = [data]
+    while stack:
+        value = stack.pop()
+        size += sys.getsizeof(value)
+        if isinstance(value, dict):
+            stack.extend(value.keys())
+            stack.extend(value.values())
+        elif isinstance(value, list):
+            stack.extend(value)
+    return size
+
+
+def overlay_value(data, path, value):
+    """Return copy of data with value at dotted path, unchanged branches are shared."""
+    key, _, rest = path.partition(".")
+    new_data = dict(data)
+    new_data[key] = overlay_value(data.get(key, {}), rest, value) if rest else value
+    return new_data
+
+
+class Backoff:
+    """Exponential backoff with full jitter, reset on first success."""
+
+    def __init__(self, base, cap):
+        """Initialize."""
+        self._base = base
+        self._cap = cap
+        self.failures = 0
+
+    def failure(self):
+        """Record failed attempt."""
+        self.failures += 1
+
+    def success(self):
+        """Record successful attempt."""
+        self.failures = 0
+
+    def delay(self):
+        """Return random delay up to exponentially growing and capped limit."""
+        limit = min(self._cap, self._base * 2 ** max(self.failures - 1, 0))
+        return random.uniform(0, limit)
+
+
+class TimedLock:
+    """Asyncio lock which records how long it was waited for and held."""
+
+    def __init__(self):
+        """Initialize."""
+        self._acquired = 0
+        self._lock = asyncio.Lock()
+        self.hold_time_last = 0
+        self.hold_time_max = 0
+        self.wait_time_max = 0
+
+    async def __aenter__(self):
+        """Acquire lock."""
+        start = time.monotonic()
+        await self._lock.acquire()
+        self._acquired = time.monotonic()
+        self.wait_time_max = max(self.wait_time_max, self._acquired - start)
+
+    async def __aexit__(self, exc_type, exc, tb):
+        """Release lock."""
+        self.hold_time_last = time.monotonic() - self._acquired
+        self.hold_time_max = max(self.hold_time_max, self.hold_time_last)
+        self._lock.release()
+
+
+def changed_paths(old_flat, new_flat):
+    """Return set of paths which differ between two flattened data."""
+    changed = {
+        path
+        for path, value in new_flat.items()
+        if old_flat.get(path, _MISSING) != value
+    }
+    changed.update(path for path in old_flat if path not in new_flat)
+    return changed
@@ -0,0 +1,105 @@
+"""Scheduler of Ariston network operations."""
+import asyncio
+import itertools
+import logging
+import time
+
+PRIORITY_WRITE = 0
+PRIORITY_CONFIRM = 1
+PRIORITY_PERIODIC = 2
+PRIORITY_DIAGNOSTICS = 3
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class AristonScheduler:
+    """Run network operations of one plant by priority.
+
+    Writes have own connection pool, so they are started immediately one after
+    another and never wait for reads. Reads are queued by priority and run one
+    at a time. Periodic and diagnostic reads are dropped while a write is
+    pending or was just sent, as they would only race it with old data.
+    """
+
+    def __init__(self, hass, name, settle_time, write_buffered):
+        """Initialize."""
+        self._hass = hass
+        self._name = name
+        self._queue = asyncio.PriorityQueue()
+        self._sequence = itertools.count()
+        self._settle_time = settle_time
+        self._worker = None
+        self._write_buffered = write_buffered
+        self._write_lock = asyncio.Lock()
+        self._write_time_start = 0
+        self._writes_pending = 0
+        self.reads_dropped = 0
+        self.wait_time_last = 0
+        self.wait_time_max = 0
+
+    def __str__(self):
+        """Return name of plant."""
+        return self._name
+
+    @property
+    def queue_depth(self):
+        """Return number of operations waiting to be run."""
+        return self._queue.qsize() + self._writes_pending
+
+    @property
+    def write_pending(self):
+        """Return True if write is buffered, queued, running or was just sent."""
+        return (
+            self._writes_pending > 0
+            or self._write_buffered()
+            or time.monotonic() - self._write_time_start < self._settle_time
+        )
+
+    def _record_wait(self, queued):
+        """Record time operation waited in queue."""
+        self.wait_time_last = time.monotonic() - queued
+        self.wait_time_max = max(self.wait_time_max, self.wait_time_last)
+
+    async def async_write(self, job):
+        """Run write job ahead of any queued read."""
+        self._writes_pending += 1
+        queued = time.monotonic()
+        try:
+            async with self._write_lock:
+                self._record_wait(queued)
+                self._write_time_start = time.monotonic()
+                return await job()
+        finally:
+            self._writes_pending -= 1
+
+    async def async_read(self, priority, job):
+        """Queue read job, return None if it was dropped."""
+        future = self._hass.loop.create_future()
+        self._queue.put_nowait(
+            (priority, next(self._sequence), time.monotonic(), job, future)
+        )
+        if self._worker is None:
+            self._worker = self._hass.async_create_task(self._async_run_reads())
+        return await future
+
+    async def _async_run_reads(self):
+        """Run queued reads in order of priority."""
+        while not self._queue.empty():
+            priority, _, queued, job, future = self._queue.get_nowait()
+            if future.done():
+                continue
+            if priority >= PRIORITY_PERIODIC and self.write_pending:
+                _LOGGER.debug("%s Reading postponed while setting data", self)
+                self.reads_dropped += 1
+                future.set_result(None)
+                continue
+            self._record_wait(queued)
+            try:
+                result = await job()
+            except Exception as error:  # pylint: disable=broad-except
+                if not future.done():
+                    future.set_exception(error)
+            else:
+                if not future.done():
+                    future.set_result(result)
+        self._worker = None
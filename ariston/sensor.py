@@ -1,15 +1,13 @@
 """Suppoort for Ariston sensors."""
-from datetime import timedelta
 import logging
 
 from homeassistant.const import CONF_NAME, CONF_SENSORS
-from homeassistant.helpers.dispatcher import async_dispatcher_connect
+from homeassistant.core import callback
 from homeassistant.helpers.entity import Entity
 
 from .const import (
     DATA_ARISTON,
     DEVICES,
-    SERVICE_UPDATE,
     PARAM_CH_ANTIFREEZE_TEMPERATURE,
     PARAM_CH_MODE,
     PARAM_CH_SET_TEMPERATURE,
@@ -21,24 +19,19 @@ from .const import (
     VALUE_TO_MODE,
 )
 
-from .helpers import log_update_error, service_signal
+from .helpers import log_update_error
 from .exceptions import AristonError
 
-"""SENSOR_SCAN_INTERVAL_SECS is used to scan changes in JSON data as command in '__init__' is not for checking and updating sensors"""
-SENSOR_SCAN_INTERVAL_SECS = 3
-
-SCAN_INTERVAL = timedelta(seconds=SENSOR_SCAN_INTERVAL_SECS)
-
 _LOGGER = logging.getLogger(__name__)
 
-# Sensor types are defined like: Name, units, icon
+# Sensor types are defined like: Name, units, icon, data paths
 SENSORS = {
-    PARAM_CH_ANTIFREEZE_TEMPERATURE: ["CH Antifreeze Temperature", '°C', "mdi:thermometer"],
-    PARAM_CH_MODE: ["CH Mode", None, "mdi:hand"],
-    PARAM_CH_SET_TEMPERATURE: ["CH Set Temperature", '°C', "mdi:thermometer"],
-    PARAM_DHW_SET_TEMPERATURE: ["DHW Set Temperature", '°C', "mdi:thermometer"],
-    PARAM_MODE: ["Mode", None, "mdi:water-boiler"],
-    PARAM_DETECTED_TEMPERATURE: ["Detected Temperature", '°C', "mdi:thermometer"],
+    PARAM_CH_ANTIFREEZE_TEMPERATURE: ["CH Antifreeze Temperature", '°C', "mdi:thermometer", ["zone.antiFreezeTemp"]],
+    PARAM_CH_MODE: ["CH Mode", None, "mdi:hand", ["zone.mode"]],
+    PARAM_CH_SET_TEMPERATURE: ["CH Set Temperature", '°C', "mdi:thermometer", ["zone.comfortTemp"]],
+    PARAM_DHW_SET_TEMPERATURE: ["DHW Set Temperature", '°C', "mdi:thermometer", ["dhwTemp"]],
+    PARAM_MODE: ["Mode", None, "mdi:water-boiler", ["mode"]],
+    PARAM_DETECTED_TEMPERATURE: ["Detected Temperature", '°C', "mdi:thermometer", ["zone.roomTemp"]],
 }
 
 
@@ -71,7 +64,13 @@ class AristonSensor(Entity):
         self._attrs = {}
         self._unit_of_measurement = SENSORS[sensor_type][1]
         self._icon = SENSORS[sensor_type][2]
-        self._unsub_dispatcher = None
+        self._paths = SENSORS[sensor_type][3]
+        self._unsub_listener = None
+
+    @property
+    def should_poll(self):
+        """Return False as entity is updated by new data from API."""
+        return False
 
     @property
     def name(self):
@@ -86,7 +85,9 @@ class AristonSensor(Entity):
     @property
     def device_state_attributes(self):
         """Return the state attributes."""
-        return self._attrs
+        attrs = dict(self._attrs)
+        attrs.update(self._api.entity_attributes(self._paths))
+        return attrs
 
     @property
     def icon(self):
@@ -157,18 +158,16 @@ class AristonSensor(Entity):
         except AristonError as error:
             log_update_error(_LOGGER, "update", self.name, "sensor", error)
 
-    async def async_on_demand_update(self):
-        """Update state."""
-        self.async_schedule_update_ha_state(True)
+    @callback
+    def async_on_demand_update(self):
+        """Update state from API data in memory, without executor job."""
+        self.update()
+        self.async_write_ha_state()
 
     async def async_added_to_hass(self):
-        """Subscribe to update signal."""
-        self._unsub_dispatcher = async_dispatcher_connect(
-            self.hass,
-            service_signal(SERVICE_UPDATE, self._signal_name),
-            self.async_on_demand_update,
-        )
+        """Subscribe to data updates."""
+        self._unsub_listener = self._api.add_listener(self.async_on_demand_update, self._paths)
 
     async def async_will_remove_from_hass(self):
-        """Disconnect from update signal."""
-        self._unsub_dispatcher()
\ No newline at end of file
+        """Disconnect from data updates."""
+        self._unsub_listener()
\ No newline at end of file
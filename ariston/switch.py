@@ -1,10 +1,9 @@
 """Suppoort for Ariston switch."""
-from datetime import timedelta
 import logging
 
 from homeassistant.components.switch import SwitchDevice
 from homeassistant.const import CONF_SWITCHES, CONF_NAME
-from homeassistant.helpers.dispatcher import async_dispatcher_connect
+from homeassistant.core import callback
 
 from .const import (
     CONF_POWER_ON,
@@ -12,22 +11,18 @@ from .const import (
     DEVICES,
     PARAM_MODE,
     PARAM_CH_MODE,
-    SERVICE_UPDATE,
     VAL_MODE_SUMMER,
     VAL_MODE_OFF,
     VAL_MODE_WINTER,
     VALUE_TO_MODE,
 )
-from .helpers import log_update_error, service_signal
-
-STATE_SCAN_INTERVAL_SECS = 3
-
-SCAN_INTERVAL = timedelta(seconds=STATE_SCAN_INTERVAL_SECS)
+from .helpers import log_update_error
 
 POWER = "power"
 
+# Switch types are defined like: Name, icon, data paths
 SWITCHES = {
-    POWER: ("Power", "mdi:power"),
+    POWER: ("Power", "mdi:power", ["mode"]),
 }
 
 async def async_setup_platform(hass, config, async_add_entities, discovery_info=None):
@@ -53,15 +48,16 @@ class AristonSwitch(SwitchDevice):
         self._api = device.api
         self._icon = SWITCHES[switch_type][1]
         self._name = "{} {}".format(name, SWITCHES[switch_type][0])
+        self._paths = SWITCHES[switch_type][2]
         self._switch_type = switch_type
         self._signal_name = name
         self._state = None
-        self._unsub_dispatcher = None
+        self._unsub_listener = None
 
     @property
     def should_poll(self):
-        """Return True if entity has to be polled for state."""
-        return True
+        """Return False as entity is updated by new data from API."""
+        return False
 
     @property
     def name(self):
@@ -73,6 +69,11 @@ class AristonSwitch(SwitchDevice):
         """Return the state attributes."""
         return self._icon
 
+    @property
+    def device_state_attributes(self):
+        """Return the state attributes."""
+        return self._api.entity_attributes(self._paths)
+
     @property
     def available(self):
         """Return True if entity is available."""
@@ -111,18 +112,15 @@ class AristonSwitch(SwitchDevice):
         """Update data"""
         return
 
-    async def async_on_demand_update(self):
-        """Update state."""
-        self.async_schedule_update_ha_state(True)
+    @callback
+    def async_on_demand_update(self):
+        """Update state, it is read from API data so no update job is needed."""
+        self.async_write_ha_state()
 
     async def async_added_to_hass(self):
-        """Subscribe to update signal."""
-        self._unsub_dispatcher = async_dispatcher_connect(
-            self.hass,
-            service_signal(SERVICE_UPDATE, self._signal_name),
-            self.async_on_demand_update,
-        )
+        """Subscribe to data updates."""
+        self._unsub_listener = self._api.add_listener(self.async_on_demand_update, self._paths)
 
     async def async_will_remove_from_hass(self):
-        """Disconnect from update signal."""
-        self._unsub_dispatcher()
\ No newline at end of file
+        """Disconnect from data updates."""
+        self._unsub_listener()
\ No newline at end of file
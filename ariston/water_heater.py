@@ -1,5 +1,4 @@
 """Support for Ariston water heaters."""
-from datetime import timedelta
 import logging
 
 from homeassistant.components.water_heater import (
@@ -12,6 +11,7 @@ from homeassistant.const import (
     CONF_NAME,
     TEMP_CELSIUS,
 )
+from homeassistant.core import callback
 from .const import (
     CONF_POWER_ON,
     DATA_ARISTON,
@@ -25,19 +25,16 @@ from .const import (
     VALUE_TO_MODE,
 )
 
-"""STATE_SCAN_INTERVAL_SECS is used to scan changes in JSON data as command in '__init__' is not for checking and updating sensors"""
 DEFAULT_MIN = 36.0
 DEFAULT_MAX = 60.0
 DEFAULT_TEMP = 0.0
-STATE_SCAN_INTERVAL_SECS = 3
 
 SUPPORT_FLAGS_HEATER = (SUPPORT_TARGET_TEMPERATURE | SUPPORT_OPERATION_MODE)
 SUPPORTED_OPERATIONS = [VAL_MODE_OFF, VAL_MODE_SUMMER, VAL_MODE_WINTER]
+DATA_PATHS = ["mode", "dhwTemp"]
 
 _LOGGER = logging.getLogger(__name__)
 
-SCAN_INTERVAL = timedelta(seconds=STATE_SCAN_INTERVAL_SECS)
-
 def setup_platform(hass, config, add_entities, discovery_info=None):
     """Set up the Ariston water heater devices."""
     if discovery_info is None:
@@ -56,6 +53,7 @@ class AristonWaterHeater(WaterHeaterDevice):
         """Initialize the thermostat."""
         self._name = name
         self._api = device.api
+        self._unsub_listener = None
 
     @property
     def name(self):
@@ -72,10 +70,15 @@ class AristonWaterHeater(WaterHeaterDevice):
         """Return the unique ID for this thermostat."""
         return '_'.join([self._name, 'water_heater'])
 
+    @property
+    def device_state_attributes(self):
+        """Return the state attributes."""
+        return self._api.entity_attributes(DATA_PATHS)
+
     @property
     def should_poll(self):
-        """Polling is required."""
-        return True
+        """Return False as entity is updated by new data from API."""
+        return False
 
     @property
     def available(self):
@@ -152,3 +155,16 @@ class AristonWaterHeater(WaterHeaterDevice):
     def update(self):
         """Update all Node data from Hive."""
         return
+
+    @callback
+    def async_on_demand_update(self):
+        """Update state, it is read from API data so no update job is needed."""
+        self.async_write_ha_state()
+
+    async def async_added_to_hass(self):
+        """Subscribe to data updates."""
+        self._unsub_listener = self._api.add_listener(self.async_on_demand_update, DATA_PATHS)
+
+    async def async_will_remove_from_hass(self):
+        """Disconnect from data updates."""
+        self._unsub_listener()
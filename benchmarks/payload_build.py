@@ -0,0 +1,99 @@
+"""Compare time and allocations of building set payload by deepcopy and by copy-on-write.
+
+Run from repository root: python benchmarks/payload_build.py
+"""
+import copy
+import importlib
+import json
+import os
+import sys
+import time
+import tracemalloc
+import types
+
+ROUNDS = 2000
+PATH = "zone.comfortTemp.value"
+VALUE = 22.5
+DEROGA_TIME = "22:00"
+
+
+def load_helpers():
+    """Import ariston.helpers without running component setup, which needs Home Assistant."""
+    package = types.ModuleType("ariston")
+    package.__path__ = [os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "ariston")]
+    sys.modules["ariston"] = package
+    return importlib.import_module("ariston.helpers")
+
+
+def plant_data():
+    """Return plant document of about the size sent by Ariston."""
+    data = {
+        "mode": 1,
+        "flameSensor": False,
+        "holidayEnabled": False,
+        "dhwTemp": {"value": 45, "min": 36, "max": 60},
+        "zone": {
+            "roomTemp": 20.5,
+            "antiFreezeTemp": 5,
+            "derogaUntil": "10:00 PM",
+            "mode": {"value": 2},
+            "comfortTemp": {"value": 21, "min": 10, "max": 30},
+        },
+    }
+    for index in range(60):
+        data["item{}".format(index)] = {"value": index, "min": 0, "max": 100, "unit": "C", "allowed": [0, 1, 2]}
+    return data
+
+
+def build_deepcopy(server_data, set_param):
+    """Build payload the way it was built before copy-on-write."""
+    set_data = {}
+    set_data["NewValue"] = copy.deepcopy(server_data)
+    set_data["OldValue"] = copy.deepcopy(server_data)
+    set_data["NewValue"]["zone"]["derogaUntil"] = DEROGA_TIME
+    set_data["OldValue"]["zone"]["derogaUntil"] = DEROGA_TIME
+    for path, value in set_param.items():
+        keys = path.split(".")
+        node = set_data["NewValue"]
+        for key in keys[:-1]:
+            node = node[key]
+        node[keys[-1]] = value
+    return set_data
+
+
+def build_overlay(server_data, view_data, overlay_value):
+    """Build payload by copy-on-write, as the component does."""
+    old_value = overlay_value(server_data, "zone.derogaUntil", DEROGA_TIME)
+    new_value = overlay_value(view_data, "zone.derogaUntil", old_value["zone"]["derogaUntil"])
+    return {"NewValue": new_value, "OldValue": old_value}
+
+
+def measure(name, build):
+    """Print time and allocated bytes per payload build."""
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        build()
+    elapsed = (time.perf_counter() - start) / ROUNDS
+    tracemalloc.start()
+    payload = build()
+    allocated = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    print("{:10} {:8.1f} us {:8.1f} KB".format(name, elapsed * 1e6, allocated / 1024))
+    return payload
+
+
+def main():
+    """Run benchmark and check that both builds send the same payload."""
+    helpers = load_helpers()
+    #data was plain dictionary before it became read-only snapshot
+    plain_data = plant_data()
+    server_data = helpers.freeze_data(plain_data)
+    view_data = helpers.overlay_value(server_data, PATH, VALUE)
+    print("plant data {} bytes, {} rounds".format(len(json.dumps(server_data)), ROUNDS))
+    before = measure("deepcopy", lambda: build_deepcopy(plain_data, {PATH: VALUE}))
+    after = measure("overlay", lambda: build_overlay(server_data, view_data, helpers.overlay_value))
+    assert json.dumps(before, sort_keys=True) == json.dumps(after, sort_keys=True)
+
+
+if __name__ == "__main__":
+    main()